@@ -0,0 +1,224 @@
+"""
+Local stand-in for Yandex Disk REST API and OAuth, enough for YandexDiskService.
+Keeps files in memory, counts calls and adds configurable latency.
+"""
+import asyncio
+import hashlib
+import mimetypes
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+
+FAKE_ACCESS_TOKEN = "fake-access-token"
+
+
+@dataclass
+class FakeFile:
+    content: bytes
+    modified: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+def normalize_path(path: str) -> str:
+    return "/" + path.removeprefix("disk:").strip("/")
+
+
+def _parent(path: str) -> str:
+    return path.rsplit("/", 1)[0] or "/"
+
+
+def _timestamp(value: datetime) -> str:
+    return value.replace(microsecond=0).isoformat()
+
+
+def _error(status: int, error: str) -> web.Response:
+    return web.json_response(dict(error=error, message=error, description=error), status=status)
+
+
+class FakeYandexDisk:
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, transfer_latency: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.transfer_latency = transfer_latency
+
+        self.files: dict[str, FakeFile] = dict()
+        self.directories: set[str] = {"/"}
+        self.calls: Counter[str] = Counter()
+
+        self.base_url: str | None = None
+        self._runner: web.AppRunner | None = None
+
+    # Storage helpers, used by fixtures
+    def put(self, path: str, content: bytes):
+        path = normalize_path(path)
+        parent = _parent(path)
+
+        while parent not in self.directories:
+            self.directories.add(parent)
+            parent = _parent(parent)
+
+        self.files[path] = FakeFile(content)
+
+    # Server
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application(client_max_size=1024 ** 3)
+        app.router.add_post("/token", self.token)
+        app.router.add_get("/v1/disk/operations/{operation_id}", self.operation)
+        app.router.add_get("/v1/disk/resources", self.get_meta)
+        app.router.add_put("/v1/disk/resources", self.mkdir)
+        app.router.add_delete("/v1/disk/resources", self.remove)
+        app.router.add_get("/v1/disk/resources/download", self.download_link)
+        app.router.add_get("/v1/disk/resources/upload", self.upload_link)
+        app.router.add_get("/_storage/{path:.*}", self.download)
+        app.router.add_put("/_storage/{path:.*}", self.upload)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{port}"
+
+        return self.base_url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _call(self, name: str, latency: float):
+        self.calls[name] += 1
+
+        if latency or self.jitter:
+            await asyncio.sleep(latency + random.uniform(0, self.jitter))
+
+    def _authorized(self, request: web.Request) -> bool:
+        return request.headers.get("Authorization", "").endswith(FAKE_ACCESS_TOKEN)
+
+    def _resource(self, path: str) -> dict:
+        name = path.rsplit("/", 1)[1] or "disk"
+        modified = _timestamp(datetime.now(timezone.utc))
+
+        if path in self.directories:
+            return dict(name=name, path="disk:" + path, type="dir", created=modified, modified=modified)
+
+        file = self.files[path]
+
+        return dict(
+            name=name,
+            path="disk:" + path,
+            type="file",
+            size=len(file.content),
+            mime_type=mimetypes.guess_type(name)[0] or "application/octet-stream",
+            md5=hashlib.md5(file.content).hexdigest(),
+            created=_timestamp(file.modified),
+            modified=_timestamp(file.modified),
+            revision=int(file.modified.timestamp() * 1_000_000),
+        )
+
+    # Handlers
+    async def token(self, request: web.Request) -> web.Response:
+        await self._call("oauth.token", self.latency)
+        return web.json_response(dict(access_token=FAKE_ACCESS_TOKEN, token_type="bearer", expires_in=31536000))
+
+    async def operation(self, request: web.Request) -> web.Response:
+        await self._call("operations.get", self.latency)
+
+        if not self._authorized(request):
+            return _error(401, "UnauthorizedError")
+
+        return _error(404, "DiskOperationNotFoundError")
+
+    async def get_meta(self, request: web.Request) -> web.Response:
+        await self._call("resources.get", self.latency)
+        path = normalize_path(request.query["path"])
+
+        if path not in self.directories and path not in self.files:
+            return _error(404, "DiskNotFoundError")
+
+        resource = self._resource(path)
+
+        if resource["type"] == "dir":
+            prefix = path.rstrip("/") + "/"
+            children = sorted(
+                child for child in self.directories | self.files.keys()
+                if child.startswith(prefix) and child != path and "/" not in child[len(prefix):]
+            )
+            limit = int(request.query.get("limit", 20))
+            offset = int(request.query.get("offset", 0))
+
+            resource["_embedded"] = dict(
+                items=[self._resource(child) for child in children[offset:offset + limit]],
+                limit=limit,
+                offset=offset,
+                total=len(children),
+                path="disk:" + path,
+                sort="",
+            )
+
+        return web.json_response(resource)
+
+    async def mkdir(self, request: web.Request) -> web.Response:
+        await self._call("resources.mkdir", self.latency)
+        path = normalize_path(request.query["path"])
+
+        if path in self.directories:
+            return _error(409, "DiskPathPointsToExistentDirectoryError")
+
+        if _parent(path) not in self.directories:
+            return _error(409, "DiskPathDoesntExistsError")
+
+        self.directories.add(path)
+        return web.json_response(dict(href=f"{self.base_url}/v1/disk/resources?path={path}", method="GET"), status=201)
+
+    async def remove(self, request: web.Request) -> web.Response:
+        await self._call("resources.delete", self.latency)
+        path = normalize_path(request.query["path"])
+
+        if self.files.pop(path, None) is None:
+            return _error(404, "DiskNotFoundError")
+
+        return web.Response(status=204)
+
+    async def download_link(self, request: web.Request) -> web.Response:
+        await self._call("resources.download_link", self.latency)
+        path = normalize_path(request.query["path"])
+
+        if path not in self.files:
+            return _error(404, "DiskNotFoundError")
+
+        return web.json_response(dict(href=f"{self.base_url}/_storage{path}", method="GET", templated=False))
+
+    async def upload_link(self, request: web.Request) -> web.Response:
+        await self._call("resources.upload_link", self.latency)
+        path = normalize_path(request.query["path"])
+
+        if _parent(path) not in self.directories:
+            return _error(409, "DiskPathDoesntExistsError")
+
+        return web.json_response(
+            dict(operation_id="0", href=f"{self.base_url}/_storage{path}", method="PUT", templated=False)
+        )
+
+    async def download(self, request: web.Request) -> web.StreamResponse:
+        await self._call("storage.download", self.transfer_latency)
+        file = self.files.get(normalize_path(request.match_info["path"]))
+
+        if file is None:
+            return web.Response(status=404)
+
+        # Only "bytes=<start>-" form is used by backend
+        if request.http_range.start:
+            return web.Response(body=file.content[request.http_range.start:], status=206)
+
+        return web.Response(body=file.content)
+
+    async def upload(self, request: web.Request) -> web.Response:
+        await self._call("storage.upload", self.transfer_latency)
+        self.put(request.match_info["path"], await request.read())
+
+        return web.Response(status=201)
@@ -0,0 +1,195 @@
+"""
+Benchmark fixtures: environment, fake Yandex Disk, database and in-process app client.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+import httpx
+import psutil
+
+from .fake_yandex_disk import FakeYandexDisk
+
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+
+AUTHORIZATION_KEY = "benchmark-key"
+ADMIN_HEADERS = {"Authorization": AUTHORIZATION_KEY}
+
+
+def configure_environment(database_url: str, yandex_base_url: str):
+    """
+    Must be called before app import: configs are read on import.
+    """
+    os.environ.update(
+        DATABASE_URL=database_url,
+        AUTHORIZATION_KEY=AUTHORIZATION_KEY,
+        YANDEX_API_REFRESH_TOKEN="benchmark",
+        YANDEX_API_CLIENT_ID="benchmark",
+        YANDEX_API_CLIENT_SECRET="benchmark",
+        YANDEX_API_BASE_URL=yandex_base_url,
+        YANDEX_API_OAUTH_BASE_URL=yandex_base_url,
+        BASE_LOG_DIRECTORY=tempfile.mkdtemp(prefix="static-server-bench-logs-"),
+        JOBS_WORKER_ENABLED="false",
+    )
+
+    for path in (ROOT_DIR, SRC_DIR):
+        if path not in sys.path:
+            sys.path.append(path)
+
+
+def import_app():
+    from src.config import Config
+    from src.main import app
+
+    # .env is loaded with override, never benchmark against real database or disk
+    if Config.DATABASE_URL != os.environ["DATABASE_URL"]:
+        raise RuntimeError("Settings are overridden by .env file, run benchmarks from directory without .env")
+
+    return app
+
+
+@dataclass
+class Context:
+    app: object
+    fake: FakeYandexDisk
+    client: httpx.AsyncClient
+    file_ids: list[str] = field(default_factory=list)
+
+
+async def setup(database_url: str, latency: float, jitter: float, seed_files: int) -> Context:
+    fake = FakeYandexDisk(latency=latency, jitter=jitter)
+    base_url = await fake.start()
+
+    configure_environment(database_url, base_url)
+    app = import_app()
+
+    from tortoise import Tortoise
+
+    from src.config import TORTOISE_ORM
+    from src.infrastructure.rate_limit import limiter
+
+    # Measure application, not limiter rejections
+    limiter.enabled = False
+
+    await Tortoise.init(config=TORTOISE_ORM)
+    await Tortoise.generate_schemas()
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark")
+    context = Context(app=app, fake=fake, client=client)
+    context.file_ids = await seed(fake, seed_files)
+
+    return context
+
+
+async def teardown(context: Context):
+    from tortoise import Tortoise
+
+    await context.client.aclose()
+    await Tortoise.close_connections()
+    await context.fake.stop()
+
+
+async def seed(fake: FakeYandexDisk, count: int) -> list[str]:
+    from src.domain.files.models import File
+
+    files = []
+
+    for number in range(count):
+        file_id = uuid.uuid4()
+        id_str = str(file_id)
+        path = f"{id_str[:2]}/{id_str[2:4]}/{id_str[4:]}.txt"
+
+        fake.put(path, f"file {number}\n".encode() * 64)
+        files.append(File(
+            id=file_id,
+            title=f"Seed file {number}",
+            slug=f"seed-file-{number}",
+            path=path,
+            size=len(fake.files["/" + path].content),
+            mime_type="text/plain",
+        ))
+
+    for start in range(0, len(files), 1000):
+        await File.bulk_create(files[start:start + 1000])
+
+    return [str(file.id) for file in files]
+
+
+@dataclass
+class Result:
+    requests: int
+    errors: int
+    duration: float
+    latencies: list[float]
+    upstream_calls: Counter
+    rss_mb: float
+
+    def as_dict(self) -> dict:
+        latencies = sorted(self.latencies) or [0.0]
+
+        return dict(
+            requests=self.requests,
+            errors=self.errors,
+            throughput_rps=round(self.requests / self.duration, 2) if self.duration else 0.0,
+            p50_ms=round(statistics.median(latencies) * 1000, 3),
+            p99_ms=round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 3),
+            upstream_calls=dict(self.upstream_calls),
+            upstream_calls_per_request=round(sum(self.upstream_calls.values()) / max(self.requests, 1), 3),
+            rss_mb=round(self.rss_mb, 1),
+        )
+
+
+async def run_load(
+    context: Context,
+    request: Callable[[int], Awaitable[bool]],
+    total: int,
+    concurrency: int,
+) -> Result:
+    """
+    Run `total` requests with `concurrency` workers, request(number) returns success flag.
+    """
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(total))
+    calls_before = Counter(context.fake.calls)
+    process = psutil.Process()
+    rss = process.memory_info().rss
+
+    async def worker():
+        nonlocal errors, rss
+
+        for number in counter:
+            started = time.perf_counter()
+
+            try:
+                success = await request(number)
+            except Exception:
+                success = False
+
+            latencies.append(time.perf_counter() - started)
+            errors += not success
+
+            if number % 100 == 0:
+                rss = max(rss, process.memory_info().rss)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+
+    return Result(
+        requests=total,
+        errors=errors,
+        duration=duration,
+        latencies=latencies,
+        upstream_calls=Counter(context.fake.calls) - calls_before,
+        rss_mb=max(rss, process.memory_info().rss) / 1024 / 1024,
+    )
@@ -0,0 +1,118 @@
+"""
+Run load scenarios against in-process app with local Yandex Disk stand-in.
+
+Usage:
+    python -m benchmarks.run                                   # all scenarios, SQLite in memory
+    python -m benchmarks.run -s hot_download -s deep_pages --database-url postgres://...
+    python -m benchmarks.run --save-baseline                   # store results as baseline
+    python -m benchmarks.run --baseline benchmarks/baseline.json --tolerance 0.15
+
+Exit code is 1 if any scenario regressed against baseline.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+
+from .harness import setup, teardown
+from .scenarios import SCENARIOS
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Returns regressions: lower throughput, higher p99 or more upstream calls per request.
+    """
+    regressions = []
+
+    for name, result in results.items():
+        base = baseline.get(name)
+
+        if base is None:
+            continue
+
+        checks = [
+            ("throughput_rps", result["throughput_rps"] < base["throughput_rps"] * (1 - tolerance)),
+            ("p99_ms", result["p99_ms"] > base["p99_ms"] * (1 + tolerance)),
+            ("upstream_calls_per_request", result["upstream_calls_per_request"] > base["upstream_calls_per_request"]),
+        ]
+
+        for metric, regressed in checks:
+            if regressed:
+                regressions.append(f"{name}.{metric}: {base[metric]} -> {result[metric]}")
+
+    return regressions
+
+
+def print_table(results: dict, baseline: dict):
+    columns = ["throughput_rps", "p50_ms", "p99_ms", "upstream_calls_per_request", "rss_mb", "errors"]
+    print(f"{'scenario':<18}" + "".join(f"{column:>30}" for column in columns))
+
+    for name, result in results.items():
+        row = f"{name:<18}"
+
+        for column in columns:
+            value = str(result[column])
+
+            if name in baseline and column in baseline[name]:
+                value += f" ({baseline[name][column]})"
+
+            row += f"{value:>30}"
+
+        print(row)
+
+
+async def main(args: argparse.Namespace) -> int:
+    logging.disable(args.log_level)
+
+    context = await setup(args.database_url, args.latency, args.jitter, args.seed_files)
+    results = dict()
+
+    try:
+        for name in args.scenario or SCENARIOS:
+            results[name] = (await SCENARIOS[name](context, args.requests, args.concurrency)).as_dict()
+
+    finally:
+        await teardown(context)
+
+    baseline = dict()
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    print_table(results, baseline)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump({**baseline, **results}, file, indent=4, ensure_ascii=False)
+
+        print(f"Baseline saved: {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+
+    for regression in regressions:
+        print("REGRESSION " + regression)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Static server benchmarks.")
+    parser.add_argument("-s", "--scenario", action="append", choices=list(SCENARIOS), help="Scenario, all if not set.")
+    parser.add_argument("--database-url", default="sqlite://:memory:", help="Tortoise database url.")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per scenario.")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent clients.")
+    parser.add_argument("--seed-files", type=int, default=2000, help="Files created before scenarios.")
+    parser.add_argument("--latency", type=float, default=0.005, help="Fake Yandex Disk latency, seconds.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Fake Yandex Disk random extra latency, seconds.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline json file.")
+    parser.add_argument("--save-baseline", action="store_true", help="Save results to baseline file.")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative throughput/p99 change.")
+    parser.add_argument("--log-level", type=int, default=logging.WARNING, help="Disable app logs up to this level.")
+
+    raise SystemExit(asyncio.run(main(parser.parse_args())))
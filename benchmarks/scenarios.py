@@ -0,0 +1,116 @@
+"""
+Load scenarios, each one returns harness.Result.
+"""
+import httpx
+
+from .harness import ADMIN_HEADERS, Context, Result, run_load
+
+
+async def hot_download(context: Context, total: int, concurrency: int) -> Result:
+    """
+    Burst of downloads of one file.
+    """
+    file_id = context.file_ids[0]
+
+    async def request(number: int) -> bool:
+        response = await context.client.get(f"/{file_id}")
+        return response.status_code == 307
+
+    return await run_load(context, request, total, concurrency)
+
+
+async def uniform_download(context: Context, total: int, concurrency: int) -> Result:
+    """
+    Downloads spread uniformly over all seeded files.
+    """
+    file_ids = context.file_ids
+
+    async def request(number: int) -> bool:
+        response = await context.client.get(f"/{file_ids[number % len(file_ids)]}")
+        return response.status_code == 307
+
+    return await run_load(context, request, total, concurrency)
+
+
+async def deep_pages(context: Context, total: int, concurrency: int) -> Result:
+    """
+    Listing of the last pages, 100 items per page.
+    """
+    size = 100
+    last_page = max(1, len(context.file_ids) // size)
+    pages = list(range(max(1, last_page - 9), last_page + 1))
+
+    async def request(number: int) -> bool:
+        response = await context.client.get(
+            "/",
+            params=dict(page=pages[number % len(pages)], size=size),
+            headers=ADMIN_HEADERS,
+        )
+        return response.status_code == 200
+
+    return await run_load(context, request, total, concurrency)
+
+
+async def bulk_create(context: Context, total: int, concurrency: int) -> Result:
+    """
+    Create file records with slug generation.
+    """
+    async def request(number: int) -> bool:
+        response = await context.client.post(
+            "/",
+            json=dict(title=f"Бенчмарк bulk create file number {number}", description="Created by benchmark"),
+            headers=ADMIN_HEADERS,
+        )
+        return response.status_code == 201
+
+    return await run_load(context, request, total, concurrency)
+
+
+async def upload(context: Context, total: int, concurrency: int) -> Result:
+    """
+    Full upload: request upload link, PUT content to storage, then confirm jobs are processed.
+    """
+    from domain.jobs.service import JobsService
+
+    content = b"benchmark upload content\n" * 256
+    file_ids = context.file_ids
+    storage_client = httpx.AsyncClient()
+
+    async def request(number: int) -> bool:
+        response = await context.client.put(
+            f"/{file_ids[number % len(file_ids)]}",
+            files=dict(file=("upload.txt", content, "text/plain")),
+            headers=ADMIN_HEADERS,
+        )
+
+        if response.status_code != 307:
+            return False
+
+        storage_response = await storage_client.put(response.headers["location"], content=content)
+        return storage_response.status_code == 201
+
+    try:
+        result = await run_load(context, request, total, concurrency)
+
+    finally:
+        await storage_client.aclose()
+
+    # Jobs are part of upload cost
+    calls_before = dict(context.fake.calls)
+
+    while await JobsService().process_batch():
+        pass
+
+    for name, count in context.fake.calls.items():
+        result.upstream_calls[name] += count - calls_before.get(name, 0)
+
+    return result
+
+
+SCENARIOS = {
+    "hot_download": hot_download,
+    "uniform_download": uniform_download,
+    "deep_pages": deep_pages,
+    "bulk_create": bulk_create,
+    "upload": upload,
+}
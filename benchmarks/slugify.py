@@ -0,0 +1,61 @@
+"""
+Micro-benchmark of slugify on typical file titles.
+
+Usage:
+    python -m benchmarks.slugify
+    python -m benchmarks.slugify --number 100000 --repeat 7
+"""
+import argparse
+import sys
+import timeit
+
+from .harness import SRC_DIR
+
+
+TITLES = {
+    "ascii": [
+        "Quarterly report 2024 (final version).pdf",
+        "Meeting notes -- project kickoff",
+        "IMG_20240101_120000.jpg",
+        "How to configure the static server: step by step guide",
+    ],
+    "cyrillic": [
+        "Отчёт за третий квартал 2024 года",
+        "Инструкция по настройке сервера",
+        "Щедрый вечер: фотографии с праздника",
+        "Презентація проєкту для інвесторів",
+    ],
+    "mixed": [
+        "Café déjà vu — «Отчёт» № 5",
+        "Straße und Übergröße: Preisliste 2024",
+        "Ελληνικά κείμενα και PDF файлы",
+        "Résumé — Иван Иванов (CV) ★★★",
+    ],
+}
+
+
+def run(number: int, repeat: int) -> dict[str, float]:
+    """
+    Best time per slug of each corpus, microseconds.
+    """
+    sys.path.insert(0, SRC_DIR)
+    from utils._slugify import slugify
+
+    results = dict()
+
+    for name, titles in TITLES.items():
+        timer = timeit.Timer(lambda: [slugify(title, max_length=100) for title in titles])
+        best = min(timer.repeat(repeat=repeat, number=number))
+        results[name] = round(best / (number * len(titles)) * 1e6, 3)
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Slugify micro-benchmark.")
+    parser.add_argument("--number", type=int, default=20000, help="Runs over corpus per repeat.")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeats, best one is reported.")
+    args = parser.parse_args()
+
+    for name, microseconds in run(args.number, args.repeat).items():
+        print(f"{name:<10}{microseconds:>10} us/slug")
@@ -0,0 +1,26 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "job" (
+    "id" BIGSERIAL NOT NULL PRIMARY KEY,
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "updated_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "kind" VARCHAR(50) NOT NULL,
+    "payload" JSONB NOT NULL,
+    "status" VARCHAR(7) NOT NULL  DEFAULT 'pending',
+    "attempts" INT NOT NULL  DEFAULT 0,
+    "run_at" TIMESTAMPTZ NOT NULL,
+    "locked_until" TIMESTAMPTZ,
+    "last_error" TEXT
+);
+CREATE INDEX IF NOT EXISTS "idx_job_status_920a13" ON "job" ("status", "run_at");
+COMMENT ON COLUMN "job"."status" IS 'pending: pending\\nrunning: running\\nfailed: failed';
+COMMENT ON COLUMN "job"."run_at" IS 'Not processed before this time';
+COMMENT ON TABLE "job" IS 'Durable background job, removed after successful processing.';"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "job";"""
@@ -0,0 +1,17 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE INDEX IF NOT EXISTS "idx_file_search_vector" ON "file"
+            USING GIN (to_tsvector('simple', coalesce("title", '') || ' ' || coalesce("description", '')));
+        CREATE INDEX IF NOT EXISTS "idx_file_slug_trgm" ON "file" USING GIN ("slug" gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS "idx_file_created_at" ON "file" ("created_at");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_file_search_vector";
+        DROP INDEX IF EXISTS "idx_file_slug_trgm";
+        DROP INDEX IF EXISTS "idx_file_created_at";"""
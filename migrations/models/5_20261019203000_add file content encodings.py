@@ -0,0 +1,12 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "file" ADD "content_encodings" VARCHAR(50);
+        COMMENT ON COLUMN "file"."content_encodings" IS 'Stored compressed variants: br,gzip';"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "file" DROP COLUMN "content_encodings";"""
@@ -0,0 +1,21 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "file_downloads" (
+    "id" BIGSERIAL NOT NULL PRIMARY KEY,
+    "file_id" UUID NOT NULL,
+    "bucket" TIMESTAMPTZ NOT NULL,
+    "downloads" BIGINT NOT NULL  DEFAULT 0,
+    CONSTRAINT "uid_file_downlo_file_id_ca89a6" UNIQUE ("file_id", "bucket")
+);
+CREATE INDEX IF NOT EXISTS "idx_file_downlo_bucket_96c278" ON "file_downloads" ("bucket");
+COMMENT ON COLUMN "file_downloads"."bucket" IS 'Start of time bucket';
+COMMENT ON TABLE "file_downloads" IS
+    'Downloads of file per time bucket. Not linked by foreign key: counters are written in batches.';"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "file_downloads";"""
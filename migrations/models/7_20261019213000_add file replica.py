@@ -0,0 +1,19 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "file_replica" (
+    "id" BIGSERIAL NOT NULL PRIMARY KEY,
+    "created_at" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "storage" VARCHAR(50) NOT NULL,
+    "path" VARCHAR(300) NOT NULL,
+    "file_id" UUID NOT NULL REFERENCES "file" ("id") ON DELETE CASCADE,
+    CONSTRAINT "uid_file_replic_file_id_faa05e" UNIQUE ("file_id", "storage")
+);
+COMMENT ON TABLE "file_replica" IS 'Copy of file content in secondary storage, see STORAGE_REPLICAS.';"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "file_replica";"""
@@ -0,0 +1,12 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "file" ADD "crc32" BIGINT;
+        COMMENT ON COLUMN "file"."crc32" IS 'CRC-32 of content, lets resume ZIP archives without reading it';"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "file" DROP COLUMN "crc32";"""
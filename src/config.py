@@ -10,6 +10,13 @@ class BaseConfig(BaseSettings):
 
     AUTHORIZATION_KEY: str
 
+    # Secret of signed urls (files, local storage links), falls back to AUTHORIZATION_KEY if blank
+    SIGNED_URL_SECRET: str = ""
+
+    @property
+    def signed_url_secret(self) -> str:
+        return self.SIGNED_URL_SECRET or self.AUTHORIZATION_KEY
+
 
 Config = BaseConfig()
 
@@ -24,6 +31,8 @@ TORTOISE_ORM = dict(
             models=[
                 "aerich.models",
                 "src.domain.files.models",
+                "src.domain.jobs.models",
+                "src.domain.stats.models",
             ],
             default_connection="default",
         ),
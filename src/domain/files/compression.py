@@ -0,0 +1,87 @@
+import gzip
+from typing import Callable
+
+import brotli
+
+from .config import FilesConfig as Config
+
+
+# In order of preference
+COMPRESSORS: dict[str, Callable[[bytes], bytes]] = {
+    "br": lambda content: brotli.compress(content, quality=11),
+    "gzip": lambda content: gzip.compress(content, compresslevel=9, mtime=0),
+}
+
+VARIANT_EXTENSIONS = {
+    "br": ".br",
+    "gzip": ".gz",
+}
+
+
+def is_compressible(mime_type: str | None, size: int | None) -> bool:
+    if not mime_type or size is None:
+        return False
+
+    if not Config.COMPRESSION_MIN_SIZE <= size <= Config.COMPRESSION_MAX_SIZE:
+        return False
+
+    mime_type = mime_type.split(";")[0].strip().lower()
+    group = mime_type.split("/")[0] + "/*"
+
+    return mime_type in Config.COMPRESSIBLE_MIME_TYPES or group in Config.COMPRESSIBLE_MIME_TYPES
+
+
+def compress(content: bytes) -> dict[str, bytes]:
+    """
+    Make variants, which are smaller enough than original. CPU bound, run in thread.
+    """
+    variants = dict()
+
+    for encoding, compressor in COMPRESSORS.items():
+        compressed = compressor(content)
+
+        if len(compressed) <= len(content) * Config.COMPRESSION_MIN_RATIO:
+            variants[encoding] = compressed
+
+    return variants
+
+
+def variant_path(path: str, encoding: str) -> str:
+    return path + VARIANT_EXTENSIONS[encoding]
+
+
+def parse_encodings(value: str | None) -> list[str]:
+    return [encoding for encoding in (value or "").split(",") if encoding]
+
+
+def choose_encoding(accept_encoding: str | None, available: list[str]) -> str | None:
+    """
+    Choose best of available encodings by Accept-Encoding header q-values.
+    """
+    if not accept_encoding or not available:
+        return None
+
+    weights: dict[str, float] = dict()
+
+    for part in accept_encoding.split(","):
+        name, *params = [item.strip() for item in part.split(";")]
+        weight = 1.0
+
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    weight = float(param[2:])
+                except ValueError:
+                    weight = 0.0
+
+        weights[name.lower()] = weight
+
+    best, best_weight = None, 0.0
+
+    for encoding in COMPRESSORS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+
+        if encoding in available and weight > best_weight:
+            best, best_weight = encoding, weight
+
+    return best
@@ -2,6 +2,47 @@ from src.config import BaseConfig
 
 
 class FilesConfig(BaseConfig):
-    pass
+    SIGNED_URL_DEFAULT_TTL: int = 60 * 60
+    SIGNED_URL_MAX_TTL: int = 7 * 24 * 60 * 60
+
+    # Mime types with precompressed (br, gzip) variants, "<type>/*" matches group
+    COMPRESSIBLE_MIME_TYPES: list[str] = [
+        "text/*",
+        "application/json",
+        "application/javascript",
+        "application/xml",
+        "application/manifest+json",
+        "image/svg+xml",
+    ]
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_MAX_SIZE: int = 20 * 1024 * 1024
+    # Variant is stored only if it is smaller than original at least by this ratio
+    COMPRESSION_MIN_RATIO: float = 0.9
+
+    # Search counts matches up to this number, total_items of broader search is not exact
+    SEARCH_COUNT_LIMIT: int = 1000
+
+    LINKS_BATCH_MAX_SIZE: int = 100
+    # Parallel storage requests for links missing in cache
+    LINKS_BATCH_CONCURRENCY: int = 10
+
+    ARCHIVE_MAX_FILES: int = 10_000
+    # Entries downloaded ahead of the one being streamed, chunks buffered per entry
+    ARCHIVE_PREFETCH: int = 4
+    ARCHIVE_QUEUE_SIZE: int = 8
+
+    # Allowed widths and heights of image derivatives
+    DERIVATIVE_SIZES: list[int] = [64, 128, 256, 512, 1024, 2048]
+    DERIVATIVE_MIME_TYPES: list[str] = [
+        "image/jpeg",
+        "image/png",
+        "image/webp",
+        "image/gif",
+        "image/bmp",
+        "image/tiff",
+    ]
+    DERIVATIVE_MAX_SOURCE_SIZE: int = 30 * 1024 * 1024
+    DERIVATIVE_WORKERS: int = 2
+
 
 FilesConfig = FilesConfig()
@@ -1,7 +1,12 @@
+from datetime import datetime
 from typing import Any
 from uuid import UUID
 
-from .schemas import UniqueFieldsEnum
+from fastapi import Depends, HTTPException, Query, status
+
+from .config import FilesConfig as Config
+from .schemas import (DerivativeFormatEnum, DerivativeParams,
+                      FileSearchParams, UniqueFieldsEnum)
 from .service import FilesService
 
 service = FilesService()
@@ -13,3 +18,51 @@ async def validate_file_id(file_id: UUID) -> dict[str, Any]:
 
 async def validate_file_slug(file_slug: str) -> dict[str, Any]:
     return await service.get_instance_or_404(file_slug, field=UniqueFieldsEnum.slug)
+
+def get_search_params(
+    q: str | None = Query(None, min_length=1, max_length=200, description="Title/description words prefixes or slug"),
+    mime_type: str | None = Query(None, description="Exact mime type or group, for example: image/*"),
+    size_min: int | None = Query(None, ge=0),
+    size_max: int | None = Query(None, ge=0),
+    created_from: datetime | None = Query(None),
+    created_to: datetime | None = Query(None),
+) -> FileSearchParams:
+    return FileSearchParams(
+        q=q,
+        mime_type=mime_type,
+        size_min=size_min,
+        size_max=size_max,
+        created_from=created_from,
+        created_to=created_to,
+    )
+
+
+def get_archive_params(params: FileSearchParams = Depends(get_search_params)) -> FileSearchParams:
+    if params.q:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, "Text query is not supported for archives")
+
+    return params
+
+
+def get_derivative_params(
+    w: int | None = Query(None, description=f"Width, one of: {Config.DERIVATIVE_SIZES}"),
+    h: int | None = Query(None, description=f"Height, one of: {Config.DERIVATIVE_SIZES}"),
+    fmt: DerivativeFormatEnum | None = Query(None, description="Derivative format, webp by default"),
+) -> DerivativeParams | None:
+    """
+    Resize params, None for original file. Sizes are limited to keep derivatives cache bounded.
+    """
+    if w is None and h is None:
+        if fmt is not None:
+            raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, "Width or height is required for format")
+
+        return None
+
+    for size in (w, h):
+        if size is not None and size not in Config.DERIVATIVE_SIZES:
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                f"Size must be one of: {Config.DERIVATIVE_SIZES}",
+            )
+
+    return DerivativeParams(width=w, height=h, fmt=fmt or DerivativeFormatEnum.webp)
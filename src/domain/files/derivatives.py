@@ -0,0 +1,107 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from src.utils import SingletonMeta
+
+from .config import FilesConfig as Config
+
+
+logger = logging.getLogger(__name__)
+
+# Storage directory with derivatives, outside of files tree: <root>/<file path>/<width>x<height>.<format>
+DERIVATIVES_ROOT = "derivatives"
+
+# Format: (Pillow format, mime type, save options)
+FORMATS: dict[str, tuple[str, str, dict]] = {
+    "webp": ("WEBP", "image/webp", dict(quality=80, method=4)),
+    "jpeg": ("JPEG", "image/jpeg", dict(quality=85, optimize=True, progressive=True)),
+    "png": ("PNG", "image/png", dict(optimize=True)),
+}
+
+
+def is_derivable(mime_type: str | None, size: int | None) -> bool:
+    if not mime_type or size is None or size > Config.DERIVATIVE_MAX_SOURCE_SIZE:
+        return False
+
+    return mime_type.split(";")[0].strip().lower() in Config.DERIVATIVE_MIME_TYPES
+
+
+def derivatives_directory(path: str) -> str:
+    return f"{DERIVATIVES_ROOT}/{path}"
+
+
+def derivative_path(path: str, width: int | None, height: int | None, fmt: str) -> str:
+    return f"{derivatives_directory(path)}/{width or 0}x{height or 0}.{fmt}"
+
+
+def derivative_parent(path: str) -> str:
+    """
+    Path of original file: "derivatives/<path>/64x0.webp" -> "<path>"
+    """
+    return path.removeprefix(DERIVATIVES_ROOT + "/").rsplit("/", 1)[0]
+
+
+def render(content: bytes, width: int | None, height: int | None, fmt: str) -> bytes:
+    """
+    Fit image into width x height box (missing side is not limited), never upscale.
+    CPU bound, run in process pool.
+    """
+    pillow_format, _, options = FORMATS[fmt]
+
+    try:
+        with Image.open(io.BytesIO(content)) as image:
+            box = max(width or 0, height or 0)
+
+            # JPEG is decoded at reduced scale, still not smaller than requested box
+            image.draft("RGB", (box, box))
+            image = ImageOps.exif_transpose(image)
+
+            image.thumbnail((width or image.width, height or image.height), Image.Resampling.LANCZOS)
+
+            if pillow_format == "JPEG" and image.mode != "RGB":
+                image = image.convert("RGB")
+
+            elif image.mode not in ("RGB", "RGBA", "L", "LA"):
+                image = image.convert("RGBA")
+
+            output = io.BytesIO()
+            image.save(output, pillow_format, **options)
+
+            return output.getvalue()
+
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise ValueError(f"Can not render image: {e}") from e
+
+
+class DerivativesPool(metaclass=SingletonMeta):
+    """
+    Worker processes for rendering, started on first use.
+    """
+    def __init__(self):
+        self.executor: ProcessPoolExecutor | None = None
+
+    async def render(self, content: bytes, width: int | None, height: int | None, fmt: str) -> bytes:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=Config.DERIVATIVE_WORKERS,
+                # Do not fork process with running event loop
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(f"Derivatives pool started, workers: {Config.DERIVATIVE_WORKERS}")
+
+        return await asyncio.get_running_loop().run_in_executor(self.executor, render, content, width, height, fmt)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+            logger.info("Derivatives pool stopped")
+
+
+async def derivatives_pool_shutdown():
+    DerivativesPool().shutdown()
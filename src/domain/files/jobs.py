@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import zlib
+from typing import Any
+from uuid import UUID
+
+import yadisk
+
+from domain.jobs.service import JobsService, RetryJob
+from external.storages import StoragesService
+from external.yandex_disk import YandexDiskService
+from src.domain.files.models import File, FileReplica
+
+from .compression import (VARIANT_EXTENSIONS, compress, is_compressible,
+                          variant_path)
+from .derivatives import derivatives_directory, is_derivable
+from .service import FilesService
+
+
+logger = logging.getLogger(__name__)
+
+jobs_service = JobsService()
+
+CONFIRM_UPLOAD = "files.confirm_upload"
+COMPRESS = "files.compress"
+REPLICATE = "files.replicate"
+REMOVE_DERIVATIVES = "files.remove_derivatives"
+CHECKSUM = "files.checksum"
+REMOVE_FILE = "files.remove_file"
+
+
+
+def object_version(meta: yadisk.objects.AsyncResourceObject) -> str:
+    """
+    Changes on every upload, even of the same content. Revision is more precise than modified time.
+    """
+    return f"{meta.md5}:{meta.revision or meta.modified}"
+
+
+async def enqueue_confirm_upload(instance: File, path: str, mime_type: str | None):
+    """
+    Call before client gets upload link: version of object, which is overwritten, is saved.
+    """
+    try:
+        previous_version = object_version(await YandexDiskService().get_meta(path))
+
+    except yadisk.exceptions.PathNotFoundError:
+        previous_version = None
+
+    await jobs_service.enqueue(
+        CONFIRM_UPLOAD,
+        dict(
+            file_id=str(instance.id),
+            path=path,
+            mime_type=mime_type,
+            previous_version=previous_version,
+        ),
+    )
+
+
+async def enqueue_remove_file(file_id: UUID, path: str):
+    """
+    Call before replicas of file are deleted (by file deletion cascade or reupload), in the same transaction.
+    Removed content makes signed links of the file fail on storage, without database check on download.
+    """
+    replicas = await FileReplica.filter(file_id=file_id, path=path).values_list("storage", "path")
+
+    await jobs_service.enqueue(REMOVE_FILE, dict(path=path, replicas=[list(replica) for replica in replicas]))
+
+
+@jobs_service.handler(CONFIRM_UPLOAD)
+async def confirm_upload(payload: dict[str, Any]):
+    """
+    Wait until client uploads file to Yandex Disk, then save real path, size and mime type.
+    """
+    instance = await File.filter(id=payload["file_id"]).first()
+
+    if instance is None:
+        logger.warning("Confirm upload skipped, file deleted: " + str(payload))
+        return
+
+    try:
+        meta = await YandexDiskService().get_meta(payload["path"])
+
+    except yadisk.exceptions.PathNotFoundError:
+        raise RetryJob(f"Not uploaded yet: {payload['path']}")
+
+    # Overwrite of the same path, new content is not uploaded yet
+    if object_version(meta) == payload.get("previous_version"):
+        raise RetryJob(f"Not modified yet: {payload['path']}")
+
+    # Link could be cached between upload link request and upload itself
+    YandexDiskService().forget_download_link(payload["path"])
+
+    old_path = instance.path
+    had_derivatives = old_path and is_derivable(instance.mime_type, instance.size)
+
+    async def commit():
+        await FilesService().update_and_save_instance(
+            instance=instance,
+            data=dict(
+                path=payload["path"],
+                size=meta.size,
+                mime_type=payload["mime_type"] or meta.mime_type,
+                # Old variants and checksum are stale
+                content_encodings=None,
+                crc32=None,
+            ),
+        )
+
+        # Reuploaded with another extension: old content would be still served by signed links
+        if old_path and old_path != instance.path:
+            await enqueue_remove_file(instance.id, old_path)
+
+        # Resized images of old content are stale, removed after the new path is saved
+        elif had_derivatives:
+            await jobs_service.enqueue(REMOVE_DERIVATIVES, dict(path=old_path))
+
+        # Replicas of old content are stale too
+        await FileReplica.filter(file_id=instance.id).delete()
+
+        if StoragesService().replicas:
+            await jobs_service.enqueue(REPLICATE, dict(file_id=str(instance.id), path=instance.path, size=instance.size))
+
+        if is_compressible(instance.mime_type, instance.size):
+            await jobs_service.enqueue(COMPRESS, dict(file_id=str(instance.id), path=instance.path))
+
+        await jobs_service.enqueue(CHECKSUM, dict(file_id=str(instance.id), path=instance.path))
+
+    return commit
+
+
+@jobs_service.handler(REMOVE_DERIVATIVES)
+async def remove_derivatives(payload: dict[str, Any]):
+    await YandexDiskService().remove(derivatives_directory(payload["path"]), throw_not_found=False, permanently=True)
+
+
+@jobs_service.handler(REMOVE_FILE)
+async def remove_file(payload: dict[str, Any]):
+    """
+    Remove content of deleted file: original, compressed variants, derivatives and replicas.
+    """
+    yandex_disk_service = YandexDiskService()
+    path = payload["path"]
+    paths = [path, *(variant_path(path, encoding) for encoding in VARIANT_EXTENSIONS), derivatives_directory(path)]
+
+    await asyncio.gather(*(yandex_disk_service.remove(path, throw_not_found=False, permanently=True) for path in paths))
+
+    storages_service = StoragesService()
+
+    for name, replica_path in payload["replicas"]:
+        storage = storages_service.get(name)
+
+        if storage is None:
+            logger.warning("Replica removal skipped, no storage: " + str(dict(storage=name, path=replica_path)))
+            continue
+
+        await storage.remove(replica_path)
+
+
+@jobs_service.handler(COMPRESS)
+async def compress_variants(payload: dict[str, Any]):
+    """
+    Store precompressed variants next to original: <path>.br, <path>.gz
+    """
+    instance = await File.filter(id=payload["file_id"]).first()
+
+    if instance is None or instance.path != payload["path"]:
+        logger.warning("Compression skipped, file deleted or reuploaded: " + str(payload))
+        return
+
+    yandex_disk_service = YandexDiskService()
+
+    content = await yandex_disk_service.download(instance.path)
+    variants = await asyncio.to_thread(compress, content)
+
+    await asyncio.gather(*(
+        yandex_disk_service.upload_file(compressed, variant_path(instance.path, encoding))
+        for encoding, compressed in variants.items()
+    ))
+
+    async def commit():
+        await FilesService().update_and_save_instance(
+            instance=instance,
+            data=dict(content_encodings=",".join(variants) or None),
+        )
+
+    return commit
+
+
+@jobs_service.handler(CHECKSUM)
+async def checksum(payload: dict[str, Any]):
+    """
+    CRC-32 of content for ZIP archives, content is streamed.
+    """
+    instance = await File.filter(id=payload["file_id"]).first()
+
+    if instance is None or instance.path != payload["path"]:
+        logger.warning("Checksum skipped, file deleted or reuploaded: " + str(payload))
+        return
+
+    yandex_disk_service = YandexDiskService()
+    link = await yandex_disk_service.get_download_link(instance.path)
+    crc = 0
+    size = 0
+
+    async for chunk in yandex_disk_service.iter_link_content(link):
+        crc = zlib.crc32(chunk, crc)
+        size += len(chunk)
+
+    if size != instance.size:
+        raise RetryJob(f"Size mismatch: {instance.path}, expected {instance.size}, got {size}")
+
+    async def commit():
+        # Not saved, if file was reuploaded meanwhile
+        await File.filter(id=instance.id, path=instance.path, size=size).update(crc32=crc)
+
+    return commit
+
+
+@jobs_service.handler(REPLICATE)
+async def replicate(payload: dict[str, Any]):
+    """
+    Copy file content from primary storage to replicas, which do not have it yet.
+    """
+    instance = await File.filter(id=payload["file_id"]).first()
+
+    if instance is None or instance.path != payload["path"] or instance.size != payload["size"]:
+        logger.warning("Replication skipped, file deleted or reuploaded: " + str(payload))
+        return
+
+    storages_service = StoragesService()
+    existing = await FileReplica.filter(file_id=instance.id, path=instance.path).values_list("storage", flat=True)
+    storages = [storage for name, storage in storages_service.replicas.items() if name not in existing]
+
+    if not storages:
+        return
+
+    # Content is streamed from primary to each replica, not held in memory
+    results = await asyncio.gather(
+        *(storage.upload(storages_service.primary.iter_content(instance.path), instance.path) for storage in storages),
+        return_exceptions=True,
+    )
+    done, failed = [], []
+
+    for storage, result in zip(storages, results):
+        if isinstance(result, Exception):
+            logger.error("Replication failed: " + str(dict(storage=storage.name, path=instance.path, error=repr(result))))
+            failed.append(storage.name)
+            continue
+
+        done.append(storage.name)
+
+    async def commit():
+        for name in done:
+            await FileReplica.update_or_create(file_id=instance.id, storage=name, defaults=dict(path=instance.path))
+
+    # Done replicas are saved at once and skipped on retry
+    if failed:
+        await commit()
+        raise RetryJob(f"Replication failed: {failed}")
+
+    return commit
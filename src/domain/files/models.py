@@ -5,7 +5,7 @@ from string import ascii_letters, digits
 
 from fastapi import HTTPException
 from starlette import status
-from tortoise import fields
+from tortoise import connections, fields
 from tortoise.expressions import Q
 from tortoise.models import Model
 
@@ -14,6 +14,13 @@ from src.utils import is_uuid, slugify
 
 AVAILABLE_SLUG_CHARS = ascii_letters + digits + "-"
 
+# Shadowed by static routes of files router
+RESERVED_SLUGS = {"search", "archive"}
+
+SLUG_MAX_LENGTH = 100
+# For titles without latin letters and digits after transliteration
+DEFAULT_SLUG = "file"
+
 
 class File(Model):
     id = fields.UUIDField(pk=True, default=uuid.uuid4, null=False)
@@ -21,12 +28,14 @@ class File(Model):
     updated_at = fields.DatetimeField(auto_now=True)
 
     title = fields.CharField(max_length=100, null=True)
-    slug = fields.CharField(max_length=100, unique=True, null=True)
+    slug = fields.CharField(max_length=SLUG_MAX_LENGTH, unique=True, null=True)
     description = fields.TextField(null=True)
 
     path = fields.CharField(max_length=300, null=True)
     size = fields.IntField(description="Size in bytes", null=True)
     mime_type = fields.CharField(max_length=200, null=True)
+    content_encodings = fields.CharField(max_length=50, null=True, description="Stored compressed variants: br,gzip")
+    crc32 = fields.BigIntField(null=True, description="CRC-32 of content, lets resume ZIP archives without reading it")
 
     class Meta:
         indexes = [
@@ -34,16 +43,33 @@ class File(Model):
             ("title",),
         ]
 
-    async def generate_slug(self, title: str):
-        base_slug = slugify(title)
-        unique_slug = base_slug
-        counter = 1
+    async def generate_slug(self, title: str | None):
+        base_slug = slugify(title or "", max_length=SLUG_MAX_LENGTH) or DEFAULT_SLUG
+
+        if base_slug not in RESERVED_SLUGS and not await self.filter(slug=base_slug).exists():
+            return base_slug
+
+        # Counter is next to max taken one, found by one query instead of one per counter
+        prefix = slugify(base_slug, max_length=SLUG_MAX_LENGTH - 11)
+        counter = await self.get_max_slug_counter(prefix) + 1
 
-        while await self.filter(slug=unique_slug).exists():
-            unique_slug = f"{base_slug}-{counter}"
+        while f"{prefix}-{counter}" in RESERVED_SLUGS:
             counter += 1
 
-        return unique_slug
+        return f"{prefix}-{counter}"
+
+    @staticmethod
+    async def get_max_slug_counter(prefix: str) -> int:
+        """
+        Max counter of taken "<prefix>-<counter>" slugs, 0 if none.
+        Prefix is slugified, so it has no LIKE and regex special chars.
+        """
+        rows = await connections.get("default").execute_query_dict(
+            'SELECT max(substring("slug" FROM $2::text)::bigint) AS "counter" FROM "file" WHERE "slug" LIKE $1',
+            [f"{prefix}-%", f"^{prefix}-([0-9]{{1,10}})$"],
+        )
+
+        return rows[0]["counter"] or 0
 
     async def save(self, *args, **kwargs):
         await self.clear()
@@ -75,6 +101,9 @@ class File(Model):
         if value and is_uuid(value):
             raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, f"Slug can not be a UUID: {value}")
 
+        if value in RESERVED_SLUGS:
+            raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, f"Slug is reserved: {value}")
+
         for char in value:
             if char not in AVAILABLE_SLUG_CHARS:
                 raise HTTPException(
@@ -95,3 +124,19 @@ class File(Model):
             return None
 
         return os.path.dirname(self.path)
+
+
+class FileReplica(Model):
+    """
+    Copy of file content in secondary storage, see STORAGE_REPLICAS.
+    """
+    id = fields.BigIntField(pk=True)
+    created_at = fields.DatetimeField(auto_now_add=True)
+
+    file = fields.ForeignKeyField("models.File", related_name="replicas", on_delete=fields.CASCADE)
+    storage = fields.CharField(max_length=50)
+    path = fields.CharField(max_length=300)
+
+    class Meta:
+        table = "file_replica"
+        unique_together = (("file", "storage"),)
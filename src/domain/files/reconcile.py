@@ -0,0 +1,318 @@
+"""
+Reconcile Yandex Disk storage with file table.
+
+Orphans - objects in storage without file record, missing - file records without object in storage.
+Both sides are streamed in path order and compared with sorted merge.
+Image derivatives are checked by parent file path after the files tree, when whole storage is scanned:
+derivative is orphan, if there is no file with its parent path.
+Only objects of files layout "<xx>/<yy>/<id rest><extension>" are deleted, other orphans are reported only.
+Orphans are deleted permanently: objects in trash still use disk quota.
+
+Usage: python -m src.domain.files.reconcile [--delete] [--concurrency 16] [--time-budget 600]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import yadisk  # noqa: E402
+from tortoise import Tortoise, connections  # noqa: E402
+
+from external.yandex_disk import YandexDiskService  # noqa: E402
+from domain.files.compression import parse_encodings, variant_path  # noqa: E402
+from domain.files.derivatives import DERIVATIVES_ROOT, derivative_parent  # noqa: E402
+from infrastructure.logging import init_logging_settings  # noqa: E402
+from src.config import TORTOISE_ORM  # noqa: E402
+
+
+logger = logging.getLogger(__name__)
+
+STORAGE_PATH_PREFIX = "disk:/"
+
+DB_PAGE_SIZE = 1000
+STORAGE_PAGE_SIZE = 1000
+# Pending deletions are awaited by batches
+DELETE_BATCH_SIZE = 1000
+
+# See FilesService._make_file_path, compressed variants have extra extension
+FILE_PATH_LAYOUT = re.compile(r"[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f-]{32}[^/]*")
+
+
+@dataclass
+class StorageObject:
+    path: str
+    size: int | None
+    modified: datetime | None
+
+
+@dataclass
+class ReconcileReport:
+    storage_objects: int = 0
+    db_paths: int = 0
+    orphans: int = 0
+    missing: int = 0
+    deleted: int = 0
+    derivatives: int = 0
+    orphan_derivatives: int = 0
+    completed: bool = False
+    last_path: str | None = None
+
+
+class StorageWalker:
+    """
+    Walk storage tree in path order, listing up to `window` next directories concurrently.
+    """
+    def __init__(self, concurrency: int, window: int):
+        self.service = YandexDiskService()
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.window = window
+
+    async def walk(self, root: str) -> AsyncIterator[StorageObject]:
+        async for item in self._walk(root, await self._list(root)):
+            yield item
+
+    async def _list(self, path: str) -> list:
+        async with self.semaphore:
+            items = await self.service.list_directory(path, page_size=STORAGE_PAGE_SIZE)
+
+        items = [item for item in items if normalize_storage_path(item.path) != DERIVATIVES_ROOT]
+
+        # Dir children have "<name>/" prefix, so sort dirs by it to keep order of full paths
+        return sorted(items, key=lambda item: item.name + "/" if item.type == "dir" else item.name)
+
+    async def _walk(self, path: str, items: list) -> AsyncIterator[StorageObject]:
+        directories = iter([item for item in items if item.type == "dir"])
+        prefetched: dict[str, asyncio.Task] = dict()
+
+        def prefetch():
+            while len(prefetched) < self.window:
+                directory = next(directories, None)
+
+                if directory is None:
+                    return
+
+                prefetched[directory.path] = asyncio.create_task(self._list(directory.path))
+
+        try:
+            prefetch()
+
+            for item in items:
+                if item.type != "dir":
+                    yield StorageObject(normalize_storage_path(item.path), item.size, item.modified)
+                    continue
+
+                children = await prefetched.pop(item.path)
+                prefetch()
+
+                async for child in self._walk(item.path, children):
+                    yield child
+
+        finally:
+            for task in prefetched.values():
+                task.cancel()
+
+
+async def walk_derivatives(walker: StorageWalker) -> AsyncIterator[StorageObject]:
+    """
+    Derivatives tree, which is skipped by files walk. Missing directory is empty tree.
+    """
+    try:
+        async for item in walker.walk(DERIVATIVES_ROOT):
+            yield item
+
+    except yadisk.exceptions.PathNotFoundError:
+        return
+
+
+def normalize_storage_path(path: str) -> str:
+    return path.removeprefix(STORAGE_PATH_PREFIX).lstrip("/")
+
+
+async def iter_db_paths(prefix: str) -> AsyncIterator[str]:
+    """
+    Keyset pagination over file paths in byte order (same as python str order), uses "idx_file_path_c" index.
+    Compressed variants follow own original: "<path>" < "<path>.br" < "<path>.gz".
+    """
+    connection = connections.get("default")
+    last_path = ""
+    pattern = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+    while True:
+        rows = await connection.execute_query_dict(
+            'SELECT "path", "content_encodings" FROM "file" '
+            'WHERE "path" COLLATE "C" > $1 AND "path" COLLATE "C" LIKE $2 '
+            'ORDER BY "path" COLLATE "C" LIMIT $3',
+            [last_path, pattern, DB_PAGE_SIZE],
+        )
+
+        for row in rows:
+            yield row["path"]
+
+            for encoding in sorted(parse_encodings(row["content_encodings"]), key=lambda item: variant_path("", item)):
+                yield variant_path(row["path"], encoding)
+
+        if len(rows) < DB_PAGE_SIZE:
+            return
+
+        last_path = rows[-1]["path"]
+
+
+async def get_existing_paths(paths: list[str]) -> set[str]:
+    rows = await connections.get("default").execute_query_dict(
+        'SELECT "path" FROM "file" WHERE "path" = ANY($1)',
+        [paths],
+    )
+
+    return {row["path"] for row in rows}
+
+
+async def _next(iterator: AsyncIterator):
+    return await anext(iterator, None)
+
+
+async def reconcile(
+    root: str,
+    concurrency: int,
+    delete: bool,
+    min_age: timedelta,
+    report: ReconcileReport,
+):
+    walker = StorageWalker(concurrency=concurrency, window=concurrency)
+    storage_iterator = walker.walk(root)
+    prefix = normalize_storage_path(root)
+    db_iterator = iter_db_paths(prefix + "/" if prefix else "")
+
+    delete_before = datetime.now(timezone.utc) - min_age
+    delete_semaphore = asyncio.Semaphore(concurrency)
+    delete_tasks: list[asyncio.Task] = []
+
+    async def remove(path: str):
+        async with delete_semaphore:
+            try:
+                await walker.service.remove(path, throw_not_found=False, permanently=True)
+
+            except Exception as e:
+                logger.error(f"Failed to delete orphan: {path}, error: {e!r}")
+                return
+
+            report.deleted += 1
+
+    async def delete_later(item: StorageObject):
+        # Young objects may be uploads, which are not confirmed yet
+        if item.modified and item.modified < delete_before:
+            delete_tasks.append(asyncio.create_task(remove(item.path)))
+
+        if len(delete_tasks) >= DELETE_BATCH_SIZE:
+            await asyncio.gather(*delete_tasks, return_exceptions=True)
+            delete_tasks.clear()
+
+    async def orphan(item: StorageObject):
+        report.orphans += 1
+        print(json.dumps(dict(type="orphan", path=item.path, size=item.size)), flush=True)
+
+        if delete and FILE_PATH_LAYOUT.fullmatch(item.path):
+            await delete_later(item)
+
+    async def check_derivatives(items: list[StorageObject]):
+        existing = await get_existing_paths(list({derivative_parent(item.path) for item in items}))
+
+        for item in items:
+            report.derivatives += 1
+
+            if derivative_parent(item.path) in existing:
+                continue
+
+            report.orphan_derivatives += 1
+            print(json.dumps(dict(type="orphan_derivative", path=item.path, size=item.size)), flush=True)
+
+            if delete:
+                await delete_later(item)
+
+    def missing(path: str):
+        report.missing += 1
+        print(json.dumps(dict(type="missing", path=path)), flush=True)
+
+    storage_item, db_path = await asyncio.gather(_next(storage_iterator), _next(db_iterator))
+
+    try:
+        while storage_item is not None or db_path is not None:
+            if db_path is None or (storage_item is not None and storage_item.path < db_path):
+                await orphan(storage_item)
+                report.storage_objects += 1
+                report.last_path = storage_item.path
+                storage_item = await _next(storage_iterator)
+
+            elif storage_item is None or db_path < storage_item.path:
+                missing(db_path)
+                report.db_paths += 1
+                report.last_path = db_path
+                db_path = await _next(db_iterator)
+
+            else:
+                report.storage_objects += 1
+                report.db_paths += 1
+                report.last_path = db_path
+                storage_item, db_path = await asyncio.gather(_next(storage_iterator), _next(db_iterator))
+
+        if not prefix:
+            derivatives: list[StorageObject] = []
+
+            async for item in walk_derivatives(walker):
+                derivatives.append(item)
+
+                if len(derivatives) >= DB_PAGE_SIZE:
+                    await check_derivatives(derivatives)
+                    derivatives.clear()
+
+            if derivatives:
+                await check_derivatives(derivatives)
+
+        report.completed = True
+
+    finally:
+        await storage_iterator.aclose()
+        await db_iterator.aclose()
+        await asyncio.gather(*delete_tasks, return_exceptions=True)
+
+
+async def main(args: argparse.Namespace):
+    await Tortoise.init(config=TORTOISE_ORM)
+    report = ReconcileReport()
+
+    try:
+        async with asyncio.timeout(args.time_budget):
+            await reconcile(
+                root=args.root,
+                concurrency=args.concurrency,
+                delete=args.delete,
+                min_age=timedelta(hours=args.min_age_hours),
+                report=report,
+            )
+
+    except TimeoutError:
+        logger.warning(f"Time budget exceeded, stopped after: {report.last_path}")
+
+    finally:
+        await Tortoise.close_connections()
+
+    print(json.dumps(dict(type="summary", **asdict(report))), flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find (and optionally delete) orphan storage objects and missing files.")
+    parser.add_argument("--root", default="/", help="Storage directory to scan.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Max parallel storage requests.")
+    parser.add_argument("--time-budget", type=float, default=None, help="Stop scanning after this many seconds.")
+    parser.add_argument("--delete", action="store_true", help="Delete orphan objects.")
+    parser.add_argument("--min-age-hours", type=float, default=24, help="Do not delete orphans younger than this.")
+
+    init_logging_settings()
+    asyncio.run(main(parser.parse_args()))
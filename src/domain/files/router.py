@@ -1,29 +1,49 @@
 import logging
 import mimetypes
-from fastapi import APIRouter, BackgroundTasks, Depends
+import os
+from datetime import datetime, timezone
+from uuid import UUID
+
+import yadisk
+from fastapi import APIRouter, Depends
 from fastapi import File as FastAPIFile
-from fastapi import (HTTPException, Request, Response,
+from fastapi import (HTTPException, Query, Request, Response,
                      UploadFile, status)
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import (FileResponse, RedirectResponse,
+                               StreamingResponse)
 from fastapi_restful.cbv import cbv
+from tortoise.transactions import in_transaction
 
+from domain.stats.service import DownloadsCounter
+from external.storages import LocalDiskStorage, StoragesService
 from external.yandex_disk import YandexDiskService
-from infrastructure.auth import admin_access
-from infrastructure.route.headers import NO_CACHE_HEADER
+from infrastructure.auth import (admin_access, is_admin_request,
+                                 verify_path_signature)
+from infrastructure.route.headers import NO_CACHE_HEADER, NO_STORE_HEADER
 
 from src.domain.files.models import File
 from src.infrastructure.rate_limit import limiter
 from src.infrastructure.route.pagination import (PaginatedResponse,
                                                  PaginationParams,
                                                  get_pagination_params)
+from src.infrastructure.route.ranges import parse_range
+from src.infrastructure.route.responses import SchemaResponse
 
-from .dependencies import validate_file, validate_file_id
-from .schemas import FileCreate, FileGet, FileUpdate, UniqueFieldsEnum
-from .service import FilesService
+from .compression import choose_encoding, parse_encodings, variant_path
+from .config import FilesConfig as Config
+from .dependencies import (get_archive_params, get_derivative_params,
+                           get_search_params, validate_file,
+                           validate_file_id)
+from .derivatives import FORMATS
+from .jobs import enqueue_confirm_upload, enqueue_remove_file
+from .schemas import (DerivativeParams, FileCreate, FileGet, FileLinksGet,
+                      FileLinksRequest, FileSearchParams, FileUpdate,
+                      SignedUrlGet, UniqueFieldsEnum)
+from .service import FilesService, signed_file_path
 
 
 router = APIRouter(tags=["files"])
+signed_router = APIRouter(prefix="/s", tags=["files"])
 logger = logging.getLogger(__name__)
 
 
@@ -31,6 +51,7 @@ logger = logging.getLogger(__name__)
 class FilesView:
     service = FilesService()
     yandex_disk_service = YandexDiskService()
+    downloads_counter = DownloadsCounter()
 
     @router.get("/", response_model=PaginatedResponse[FileGet])
     @admin_access()
@@ -39,10 +60,66 @@ class FilesView:
         request: Request,
         pagination: PaginationParams = Depends(get_pagination_params),
     ):
-        return await PaginatedResponse.create(
+        return SchemaResponse(await PaginatedResponse.create(
             model=File,
             schema=FileGet,
             pagination=pagination,
+        ))
+
+    @router.get("/search", response_model=PaginatedResponse[FileGet])
+    @admin_access()
+    async def search(
+        self,
+        request: Request,
+        params: FileSearchParams = Depends(get_search_params),
+        pagination: PaginationParams = Depends(get_pagination_params),
+    ):
+        data, total_items = await self.service.search(params, pagination)
+
+        return SchemaResponse(PaginatedResponse.of(FileGet)(data=data, pagination=pagination, total_items=total_items))
+
+    @router.get("/archive", response_class=StreamingResponse)
+    @limiter.limit("10/minute")
+    async def archive(
+        self,
+        request: Request,
+        identifier: list[str] | None = Query(None, description="Ids or slugs, filters are used if not provided"),
+        params: FileSearchParams = Depends(get_archive_params),
+    ):
+        """
+        Stream ZIP archive of files, supports resume by Range and If-Range headers.
+        Archive of files by identifiers is public, same as their downloads. Archive by filters only is for admins.
+        """
+        if not identifier and not is_admin_request(request):
+            raise HTTPException(status.HTTP_403_FORBIDDEN, "Identifiers are required")
+
+        stream, etag = await self.service.get_archive(identifier, params)
+        byte_range = None
+
+        if request.headers.get("If-Range", etag) == etag:
+            byte_range = parse_range(request.headers.get("Range"), stream.size)
+
+        start, end = byte_range or (0, stream.size - 1)
+        headers = {
+            **NO_CACHE_HEADER,
+            "Accept-Ranges": "bytes",
+            "ETag": etag,
+            "Content-Length": str(end - start + 1),
+            "Content-Disposition": 'attachment; filename="files.zip"',
+            # Do not buffer archive in nginx
+            "X-Accel-Buffering": "no",
+        }
+
+        if byte_range:
+            headers["Content-Range"] = f"bytes {start}-{end}/{stream.size}"
+
+        logger.info("Archive: " + str(dict(files=len(stream.entries), size=stream.size, range=byte_range)))
+
+        return StreamingResponse(
+            stream.iter_bytes(start, end),
+            status_code=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+            media_type="application/zip",
+            headers=headers,
         )
 
     @router.get("/{identifier}/info", response_model=FileGet)
@@ -55,8 +132,8 @@ class FilesView:
     ):
         logger.info("Get file details: " + str(dict(file)))
 
-        return JSONResponse(
-            jsonable_encoder(FileGet.model_validate(file).model_dump()),
+        return SchemaResponse(
+            FileGet.model_validate(file),
             headers={**NO_CACHE_HEADER}
         )
 
@@ -65,16 +142,77 @@ class FilesView:
     async def download(
         self,
         request: Request,
-        file: File = Depends(validate_file)
+        file: File = Depends(validate_file),
+        derivative: DerivativeParams | None = Depends(get_derivative_params),
     ):
         if not file.path:
             logger.info("Failed to download file - no path: " + str(dict(file)))
             raise HTTPException(404, "No file")
 
-        url = await self.yandex_disk_service.get_download_link(file.path)
+        self.downloads_counter.hit(file.id)
+
+        if derivative:
+            url, content = await self.service.get_derivative(file, derivative)
+
+            logger.info("Download derivative: " + str(dict(file, derivative=derivative, download_url=url)))
+
+            if url:
+                return RedirectResponse(url=url)
+
+            return Response(content=content, media_type=FORMATS[derivative.fmt.value][1])
+
+        encodings = parse_encodings(file.content_encodings)
+        headers = {"Vary": "Accept-Encoding"} if encodings else {}
+        encoding = choose_encoding(request.headers.get("Accept-Encoding"), encodings)
+
+        if encoding:
+            url = await self.yandex_disk_service.get_download_link(variant_path(file.path, encoding))
+
+            logger.info("Download compressed file:" + str(dict(file, download_url=url, encoding=encoding)))
+            return StreamingResponse(
+                self.yandex_disk_service.iter_link_content(url),
+                media_type=file.mime_type,
+                headers={**headers, "Content-Encoding": encoding},
+            )
+
+        url = await self.service.get_download_link(file)
 
         logger.info("Download file:" + str(dict(file, download_url = url)))
-        return RedirectResponse(url = url)
+        return RedirectResponse(url = url, headers=headers)
+
+    @router.post("/links", response_model=FileLinksGet)
+    @limiter.limit("10/minute")
+    async def get_download_links(self, data: FileLinksRequest, request: Request):
+        """
+        Download links for many files by ids or slugs.
+        """
+        links = await self.service.get_download_links(data.identifiers)
+
+        logger.info("Download links: " + str(dict(found=len(links.links), not_found=links.not_found, failed=links.failed)))
+
+        return SchemaResponse(links)
+
+    @router.post("/{identifier}/signed-url", response_model=SignedUrlGet)
+    @admin_access()
+    async def create_signed_url(
+        self,
+        request: Request,
+        ttl: int = Query(Config.SIGNED_URL_DEFAULT_TTL, ge=1, le=Config.SIGNED_URL_MAX_TTL),
+        file: File = Depends(validate_file),
+    ):
+        expires, signature = self.service.sign_path(file, ttl)
+        url = request.url_for("download_signed", file_id=file.id, path=file.path).include_query_params(
+            exp=expires,
+            sig=signature,
+        )
+
+        logger.info("Signed url created: " + str(dict(file, expires=expires)))
+
+        return SchemaResponse(
+            SignedUrlGet(url=str(url), expires_at=datetime.fromtimestamp(expires, timezone.utc)),
+            status_code=status.HTTP_201_CREATED,
+            headers={**NO_CACHE_HEADER},
+        )
 
     @router.post("/", response_model=FileGet)
     @admin_access()
@@ -84,12 +222,12 @@ class FilesView:
         await new_file.validate_unique()
         await new_file.save()
 
-        new_file = FileGet.model_validate(new_file).model_dump()
+        new_file = FileGet.model_validate(new_file)
 
         logger.info("Created file: " + str(new_file))
 
-        return JSONResponse(
-            jsonable_encoder(new_file),
+        return SchemaResponse(
+            new_file,
             status_code=status.HTTP_201_CREATED,
             headers={**NO_CACHE_HEADER},
         )
@@ -111,10 +249,8 @@ class FilesView:
 
         await file.save()
 
-        return JSONResponse(
-            content=jsonable_encoder(
-                FileGet.model_validate(file).model_dump()
-            ),
+        return SchemaResponse(
+            FileGet.model_validate(file),
             status_code=status.HTTP_200_OK,
             headers={**NO_CACHE_HEADER}
         )
@@ -124,7 +260,6 @@ class FilesView:
     async def upload(
         self,
         request: Request,
-        background_tasks: BackgroundTasks,
         file: UploadFile = FastAPIFile(...),
         instance: File = Depends(validate_file),
     ):
@@ -133,14 +268,11 @@ class FilesView:
 
             upload_path, upload_url = await self.service.get_upload_data(instance, file)
 
-            background_tasks.add_task(
-                self.service.update_and_save_instance,
-                instance=instance,
-                data=dict(
-                    path=upload_path,
-                    size=file.size,
-                    mime_type=file.content_type or mimetypes.guess_type(file.filename)[0]
-                )
+            # Size and mime type are saved by job, when upload is confirmed by Yandex Disk
+            await enqueue_confirm_upload(
+                instance,
+                path=upload_path,
+                mime_type=file.content_type or mimetypes.guess_type(file.filename)[0],
             )
 
             return RedirectResponse(url=upload_url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
@@ -159,5 +291,52 @@ class FilesView:
     ):
         logger.warning("Delete file: " + str(dict(file)))
 
-        await file.delete()
+        async with in_transaction():
+            # Content is removed by job, so signed links of the file stop working
+            if file.path:
+                await enqueue_remove_file(file.id, file.path)
+
+            await file.delete()
         return Response(status_code=status.HTTP_204_NO_CONTENT, headers={**NO_CACHE_HEADER})
+
+
+@signed_router.get("/local/{storage}/{path:path}")
+async def download_local(storage: str, path: str, exp: int, sig: str):
+    """
+    Download replica from local storage by signed link.
+    """
+    if not verify_path_signature(Config.signed_url_secret, f"{storage}/{path}", exp, sig):
+        logger.warning("Invalid local storage url: " + str(dict(storage=storage, path=path, exp=exp)))
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "Invalid or expired signature")
+
+    backend = StoragesService().get(storage)
+
+    if not isinstance(backend, LocalDiskStorage):
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "No storage")
+
+    full_path = backend.full_path(path)
+
+    if not os.path.isfile(full_path):
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "No file")
+
+    return FileResponse(full_path, media_type=mimetypes.guess_type(path)[0])
+
+
+@signed_router.get("/{file_id}/{path:path}")
+async def download_signed(file_id: UUID, path: str, exp: int, sig: str):
+    """
+    Download by signed url: signature check only, without database and rate limit.
+    Content of deleted file is removed from storage, so its links get 404 there.
+    """
+    if not verify_path_signature(Config.signed_url_secret, signed_file_path(file_id, path), exp, sig):
+        logger.warning("Invalid signed url: " + str(dict(file_id=file_id, path=path, exp=exp)))
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "Invalid or expired signature")
+
+    try:
+        url = await YandexDiskService().get_download_link(path)
+
+    except yadisk.exceptions.PathNotFoundError:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "No file")
+
+    # Redirect must not outlive signature in nginx cache, its key contains exp and sig
+    return RedirectResponse(url=url, headers={**NO_STORE_HEADER})
@@ -3,10 +3,12 @@ from enum import Enum
 from typing import Optional
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from src.domain.files.models import File
 from tortoise.contrib.pydantic import pydantic_model_creator
 
+from .config import FilesConfig
+
 
 PydanticFile = pydantic_model_creator(File, name="File")
 
@@ -35,6 +37,27 @@ class FileUpdate(FileCreate):
     pass
 
 
+class DerivativeFormatEnum(str, Enum):
+    webp = "webp"
+    jpeg = "jpeg"
+    png = "png"
+
+
+class DerivativeParams(BaseModel):
+    width: Optional[int] = None
+    height: Optional[int] = None
+    fmt: DerivativeFormatEnum = DerivativeFormatEnum.webp
+
+
+class FileSearchParams(BaseModel):
+    q: Optional[str] = None
+    mime_type: Optional[str] = None
+    size_min: Optional[int] = None
+    size_max: Optional[int] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+
 class FileGet(BaseModel):
     id: UUID
     created_at: datetime
@@ -61,3 +84,57 @@ class FileGet(BaseModel):
                 "mime_type": "text/plain",
             }
         }
+
+
+class SignedUrlGet(BaseModel):
+    url: str
+    expires_at: datetime
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "url": (
+                    "http://localhost:8080/s/123e4567-e89b-12d3-a456-426614174000/"
+                    "12/3e/4567-e89b-12d3-a456-426614174000.txt?exp=1724070896&sig=abc"
+                ),
+                "expires_at": "2024-08-19T12:34:56",
+            }
+        }
+
+
+class FileLinksRequest(BaseModel):
+    identifiers: list[str] = Field(min_length=1, max_length=FilesConfig.LINKS_BATCH_MAX_SIZE)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "identifiers": ["123e4567-e89b-12d3-a456-426614174000", "example-slug"],
+            }
+        }
+
+
+class FileLink(BaseModel):
+    url: str
+    expires_at: datetime
+
+
+class FileLinksGet(BaseModel):
+    links: dict[str, FileLink]
+    # No file, no uploaded content or no object in storage
+    not_found: list[str]
+    # Storage error, client may retry these
+    failed: list[str] = []
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "links": {
+                    "example-slug": {
+                        "url": "https://downloader.disk.yandex.ru/disk/...",
+                        "expires_at": "2024-08-19T12:34:56Z",
+                    }
+                },
+                "not_found": ["123e4567-e89b-12d3-a456-426614174000"],
+                "failed": [],
+            }
+        }
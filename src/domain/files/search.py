@@ -0,0 +1,118 @@
+import re
+from typing import Any
+
+from tortoise import connections
+
+from src.infrastructure.route.pagination import PaginationParams
+
+from .config import FilesConfig as Config
+from .schemas import FileSearchParams
+
+
+# Must be the same as expression of "idx_file_search_vector" index
+SEARCH_VECTOR = "to_tsvector('simple', coalesce(\"title\", '') || ' ' || coalesce(\"description\", ''))"
+
+SEARCH_COLUMNS = '"id", "created_at", "updated_at", "title", "slug", "description", "mime_type", "size"'
+
+WORD_REGEX = re.compile(r"[^\W_]+")
+
+
+def _make_prefix_tsquery(text: str) -> str | None:
+    """
+    "big cat" -> "big:* & cat:*"
+    """
+    words = WORD_REGEX.findall(text.lower())
+
+    if not words:
+        return None
+
+    return " & ".join(word + ":*" for word in words)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def search_files(params: FileSearchParams, pagination: PaginationParams) -> tuple[list[dict[str, Any]], int]:
+    """
+    Full-text prefix search over title and description, prefix and fuzzy (trigram) search over slug.
+    Uses GIN indexes, see migration "add file search indexes".
+    Total is exact on the last page, otherwise it is counted up to SEARCH_COUNT_LIMIT.
+    """
+    conditions = []
+    values = []
+
+    def value(item: Any) -> str:
+        values.append(item)
+        return f"${len(values)}"
+
+    rank = "0"
+
+    if params.q:
+        matches = [
+            f'"slug" ILIKE {value(_escape_like(params.q.lower()) + "%")}',
+            f'"slug" % {value(params.q.lower())}',
+        ]
+        rank = f'similarity("slug", ${len(values)})'
+
+        tsquery = _make_prefix_tsquery(params.q)
+
+        if tsquery:
+            tsquery_value = value(tsquery)
+            matches.append(f"{SEARCH_VECTOR} @@ to_tsquery('simple', {tsquery_value})")
+            rank += f" + ts_rank({SEARCH_VECTOR}, to_tsquery('simple', {tsquery_value}))"
+
+        conditions.append("(" + " OR ".join(matches) + ")")
+
+    if params.mime_type:
+        if params.mime_type.endswith("/*"):
+            conditions.append(f'"mime_type" LIKE {value(_escape_like(params.mime_type[:-1]) + "%")}')
+        else:
+            conditions.append(f'"mime_type" = {value(params.mime_type)}')
+
+    if params.size_min is not None:
+        conditions.append(f'"size" >= {value(params.size_min)}')
+
+    if params.size_max is not None:
+        conditions.append(f'"size" <= {value(params.size_max)}')
+
+    if params.created_from is not None:
+        conditions.append(f'"created_at" >= {value(params.created_from)}')
+
+    if params.created_to is not None:
+        conditions.append(f'"created_at" <= {value(params.created_to)}')
+
+    where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+
+    filter_values = list(values)
+
+    # One extra row shows, whether there are more matches
+    rows = await connections.get("default").execute_query_dict(
+        f'SELECT {SEARCH_COLUMNS} FROM "file" {where} '
+        f'ORDER BY {rank} DESC, "created_at" DESC LIMIT {value(pagination.size + 1)} OFFSET {value(pagination.offset)}',
+        values,
+    )
+
+    if len(rows) > pagination.size:
+        return rows[:pagination.size], await _count_matches(where, filter_values, pagination)
+
+    # Last page, total is known without counting
+    if rows or not pagination.offset:
+        return rows, pagination.offset + len(rows)
+
+    # Page after the last one
+    return rows, await _count_matches(where, filter_values, pagination)
+
+
+async def _count_matches(where: str, values: list[Any], pagination: PaginationParams) -> int:
+    """
+    Count up to SEARCH_COUNT_LIMIT matches (at least to the next page), broad search does not count millions of rows.
+    """
+    limit = max(Config.SEARCH_COUNT_LIMIT, pagination.offset + pagination.size + 1)
+
+    rows = await connections.get("default").execute_query_dict(
+        f'SELECT count(*) AS "total_items" FROM (SELECT 1 FROM "file" {where} LIMIT ${len(values) + 1}) AS "matches"',
+        [*values, limit],
+    )
+
+    return rows[0]["total_items"]
@@ -1,15 +1,32 @@
+import asyncio
+import hashlib
 import logging
 import mimetypes
 import os
 from dataclasses import dataclass
+from datetime import datetime, timezone
+from time import time
+from uuid import UUID
 
+import yadisk
 from fastapi import HTTPException, UploadFile
 from starlette import status
+from tortoise.expressions import Q
 
-from domain.files.schemas import UniqueFieldsEnum
+from domain.files.schemas import (DerivativeParams, FileGet, FileLink,
+                                  FileLinksGet, FileSearchParams,
+                                  UniqueFieldsEnum)
+from external.storages import StoragesService
 from external.yandex_disk import YandexDiskService
-from src.domain.files.models import File
-from src.utils import SingletonMeta
+from infrastructure.auth import sign_path
+from src.domain.files.models import File, FileReplica
+from src.infrastructure.route.pagination import PaginationParams
+from src.utils import (SingletonMeta, ZipEntry, ZipStream, is_uuid,
+                       unique_entry_names)
+
+from .config import FilesConfig as Config
+from .derivatives import DerivativesPool, derivative_path, is_derivable
+from .search import search_files
 
 
 logger = logging.getLogger(__name__)
@@ -17,10 +34,22 @@ logger = logging.getLogger(__name__)
 
 type upload_path = str
 type upload_url = str
+type expires = int
+type signature = str
+type etag = str
+type download_url = str
+type content = bytes
+
+
+def signed_file_path(file_id: UUID, path: str) -> str:
+    return f"{file_id}/{path}"
 
 
 class FilesService(metaclass=SingletonMeta):
     yandex_disk_service = YandexDiskService()
+    storages_service = StoragesService()
+    # Derivative path: rendering task, shared by concurrent requests
+    derivative_tasks: dict[str, asyncio.Task] = dict()
 
     async def get_upload_data(self, instance: File, file: UploadFile) -> tuple[upload_path, upload_url]:
         new_path = self._make_file_path(instance, file)
@@ -50,6 +79,182 @@ class FilesService(metaclass=SingletonMeta):
     async def get_instance(self, identifier: str, field: UniqueFieldsEnum = UniqueFieldsEnum.id) -> File | None:
         return await File.filter(**{field: identifier}).first()
 
+    async def search(self, params: FileSearchParams, pagination: PaginationParams) -> tuple[list[FileGet], int]:
+        rows, total_items = await search_files(params, pagination)
+
+        return [FileGet.model_validate(row) for row in rows], total_items
+
+    async def get_download_link(self, instance: File) -> download_url:
+        """
+        Link from primary storage or replica, whichever is healthy and faster.
+        """
+        if not self.storages_service.replicas:
+            return await self.yandex_disk_service.get_download_link(instance.path)
+
+        replicas = await FileReplica.filter(file_id=instance.id, path=instance.path).values_list("storage", flat=True)
+
+        return await self.storages_service.get_download_link(instance.path, replicas)
+
+    async def get_download_links(self, identifiers: list[str]) -> FileLinksGet:
+        """
+        Resolve ids and slugs by one query, get download links concurrently.
+        """
+        identifiers = list(dict.fromkeys(identifiers))
+        # Ids are matched in canonical lowercase form, results are returned by identifiers of request
+        keys = {
+            identifier: str(UUID(identifier)) if is_uuid(identifier) else identifier
+            for identifier in identifiers
+        }
+        ids = [keys[identifier] for identifier in identifiers if is_uuid(identifier)]
+        slugs = [identifier for identifier in identifiers if not is_uuid(identifier)]
+
+        files = await File.filter(Q(id__in=ids) | Q(slug__in=slugs)).only("id", "slug", "path")
+
+        paths = dict()
+
+        for file in files:
+            if file.path:
+                paths[str(file.id)] = file.path
+                paths[file.slug] = file.path
+
+        links = await self.yandex_disk_service.get_download_links(
+            list({paths[key] for key in keys.values() if key in paths}),
+            concurrency=Config.LINKS_BATCH_CONCURRENCY,
+        )
+        result = FileLinksGet(links=dict(), not_found=[], failed=[])
+
+        for identifier, key in keys.items():
+            link = links.get(paths.get(key))
+
+            if link is None or isinstance(link, yadisk.exceptions.PathNotFoundError):
+                result.not_found.append(identifier)
+
+            elif isinstance(link, Exception):
+                logger.error(f"Failed to get download link: {paths[key]}, error: {link!r}")
+                result.failed.append(identifier)
+
+            else:
+                result.links[identifier] = FileLink(url=link[0], expires_at=datetime.fromtimestamp(link[1], timezone.utc))
+
+        return result
+
+    async def get_derivative(self, instance: File, params: DerivativeParams) -> tuple[download_url | None, content | None]:
+        """
+        Link to cached derivative or content of just rendered one.
+        """
+        if not is_derivable(instance.mime_type, instance.size):
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, "File can not be resized")
+
+        path = derivative_path(instance.path, params.width, params.height, params.fmt.value)
+
+        try:
+            return await self.yandex_disk_service.get_download_link(path), None
+
+        except yadisk.exceptions.PathNotFoundError:
+            pass
+
+        task = self.derivative_tasks.get(path)
+
+        if task is None:
+            task = asyncio.create_task(self._create_derivative(instance.path, path, params))
+            task.add_done_callback(lambda _: self.derivative_tasks.pop(path, None))
+            self.derivative_tasks[path] = task
+
+        try:
+            # Disconnect of one client does not cancel rendering for others
+            return None, await asyncio.shield(task)
+
+        except ValueError:
+            raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, "File can not be resized")
+
+    async def _create_derivative(self, source_path: str, path: str, params: DerivativeParams) -> bytes:
+        original = await self.yandex_disk_service.download(source_path)
+        rendered = await DerivativesPool().render(original, params.width, params.height, params.fmt.value)
+
+        logger.info("Derivative rendered: " + str(dict(path=path, size=len(rendered), original_size=len(original))))
+
+        try:
+            await self.yandex_disk_service.upload_file(rendered, path)
+
+        except Exception:
+            logger.exception(f"Failed to store derivative: {path}")
+
+        return rendered
+
+    async def get_archive(self, identifiers: list[str] | None, params: FileSearchParams) -> tuple[ZipStream, etag]:
+        """
+        ZIP archive of selected files or files matching filters, ordered to make archive reproducible for resume.
+        """
+        query = File.filter(self._archive_filters(identifiers, params), path__not_isnull=True, size__not_isnull=True)
+        files = await query.order_by("created_at", "id").limit(Config.ARCHIVE_MAX_FILES + 1)
+
+        if not files:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, "No files")
+
+        if len(files) > Config.ARCHIVE_MAX_FILES:
+            raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, f"Too many files, max: {Config.ARCHIVE_MAX_FILES}")
+
+        names = unique_entry_names([f"{file.slug or file.id}{os.path.splitext(file.path)[1]}" for file in files])
+        entries = [
+            ZipEntry(
+                name=name,
+                size=file.size,
+                modified_at=file.updated_at,
+                open=self._content_opener(file.path),
+                crc=file.crc32,
+            )
+            for name, file in zip(names, files)
+        ]
+
+        version = hashlib.sha256()
+
+        for file in files:
+            version.update(f"{file.id}:{file.path}:{file.size}:{file.crc32}:{file.updated_at.isoformat()};".encode())
+
+        stream = ZipStream(entries, prefetch=Config.ARCHIVE_PREFETCH, queue_size=Config.ARCHIVE_QUEUE_SIZE)
+
+        return stream, f'"{version.hexdigest()[:32]}"'
+
+    def _archive_filters(self, identifiers: list[str] | None, params: FileSearchParams) -> Q:
+        filters = []
+
+        if identifiers:
+            ids = [identifier for identifier in identifiers if is_uuid(identifier)]
+            slugs = [identifier for identifier in identifiers if not is_uuid(identifier)]
+            filters.append(Q(id__in=ids) | Q(slug__in=slugs))
+
+        if params.mime_type:
+            if params.mime_type.endswith("/*"):
+                filters.append(Q(mime_type__startswith=params.mime_type[:-1]))
+            else:
+                filters.append(Q(mime_type=params.mime_type))
+
+        if params.size_min is not None:
+            filters.append(Q(size__gte=params.size_min))
+
+        if params.size_max is not None:
+            filters.append(Q(size__lte=params.size_max))
+
+        if params.created_from is not None:
+            filters.append(Q(created_at__gte=params.created_from))
+
+        if params.created_to is not None:
+            filters.append(Q(created_at__lte=params.created_to))
+
+        if not filters:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, "Identifiers or filters are required")
+
+        return Q(*filters)
+
+    def _content_opener(self, path: str):
+        async def content(offset: int = 0):
+            link = await self.yandex_disk_service.get_download_link(path)
+
+            async for chunk in self.yandex_disk_service.iter_link_content(link, offset=offset):
+                yield chunk
+
+        return content
+
     async def update_and_save_instance(self, instance: File, data: dict):
         """
         Update instance if need, logs changes
@@ -67,6 +272,17 @@ class FilesService(metaclass=SingletonMeta):
 
         logger.info("No changes for modify: " + str(dict(instance)))
 
+    def sign_path(self, instance: File, ttl: int | None = None) -> tuple[expires, signature]:
+        """
+        Sign file id and storage path for direct download, link is invalid after file is deleted or reuploaded.
+        """
+        if not instance.path:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, "No file")
+
+        expires_at = int(time()) + (ttl or Config.SIGNED_URL_DEFAULT_TTL)
+
+        return expires_at, sign_path(Config.signed_url_secret, signed_file_path(instance.id, instance.path), expires_at)
+
     def raise_not_found(self, identifier: str, field: UniqueFieldsEnum = UniqueFieldsEnum.id):
         logger.error(f"Not found, {identifier=}, {field=}")
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Not found")
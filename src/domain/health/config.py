@@ -0,0 +1,16 @@
+from src.config import BaseConfig
+
+
+class HealthConfig(BaseConfig):
+    # Readiness probes are run not more often, results are shared by concurrent requests
+    HEALTH_CACHE_TTL: float = 5.0
+    HEALTH_DB_TIMEOUT: float = 2.0
+
+    # Concurrent requests per worker, others get 503 with Retry-After. 0 disables limit
+    ADMISSION_MAX_IN_FLIGHT: int = 200
+    # Responses being sent per worker (archives, proxied content), new requests get 503 over it. 0 disables limit
+    ADMISSION_MAX_STREAMING: int = 100
+    ADMISSION_RETRY_AFTER: int = 1
+
+
+HealthConfig = HealthConfig()
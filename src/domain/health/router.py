@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Request, status
+from fastapi_restful.cbv import cbv
+
+from infrastructure.route.headers import NO_CACHE_HEADER
+from infrastructure.route.middlewares import AdmissionControl
+
+from src.infrastructure.route.responses import SchemaResponse
+
+from .schemas import AdmissionGet, HealthStatusEnum, LivenessGet, ReadinessGet
+from .service import HealthService, get_status
+
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@cbv(router)
+class HealthView:
+    health_service = HealthService()
+
+    @router.get("/live", response_model=LivenessGet)
+    async def live(self):
+        """
+        Process is running and event loop responds. Dependencies are not checked.
+        """
+        return SchemaResponse(LivenessGet(status=HealthStatusEnum.ok), headers={**NO_CACHE_HEADER})
+
+    @router.get(
+        "/ready",
+        response_model=ReadinessGet,
+        responses={status.HTTP_503_SERVICE_UNAVAILABLE: {"model": ReadinessGet}},
+    )
+    async def ready(self, request: Request):
+        """
+        503 if database is unavailable or Yandex Disk token is invalid.
+        Open circuit of Yandex Disk is "degraded": stale links and replicas are still served.
+        """
+        checks = await self.health_service.get_checks()
+        readiness_status = get_status(checks)
+
+        admission: AdmissionControl | None = getattr(request.app.state, "admission", None)
+
+        return SchemaResponse(
+            ReadinessGet(
+                status=readiness_status,
+                checks=checks,
+                admission=AdmissionGet(
+                    in_flight=admission.in_flight,
+                    max_in_flight=admission.max_in_flight,
+                    streaming=admission.streaming,
+                    max_streaming=admission.max_streaming,
+                    rejected=admission.rejected,
+                ) if admission else None,
+            ),
+            status_code=(
+                status.HTTP_503_SERVICE_UNAVAILABLE
+                if readiness_status == HealthStatusEnum.failed
+                else status.HTTP_200_OK
+            ),
+            headers={**NO_CACHE_HEADER},
+        )
@@ -0,0 +1,53 @@
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class HealthStatusEnum(str, Enum):
+    ok = "ok"
+    # Works with fallbacks: stale links, replicas
+    degraded = "degraded"
+    failed = "failed"
+
+
+class ProbeGet(BaseModel):
+    status: HealthStatusEnum
+    detail: Optional[str] = None
+
+
+class LivenessGet(BaseModel):
+    status: HealthStatusEnum
+
+
+class AdmissionGet(BaseModel):
+    in_flight: int
+    max_in_flight: int
+    streaming: int
+    max_streaming: int
+    rejected: int
+
+
+class ReadinessGet(BaseModel):
+    status: HealthStatusEnum
+    checks: dict[str, ProbeGet]
+    admission: Optional[AdmissionGet] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "status": "degraded",
+                "checks": {
+                    "database": {"status": "ok", "detail": None},
+                    "yandex_disk_token": {"status": "ok", "detail": None},
+                    "yandex_disk_circuit": {"status": "degraded", "detail": "open"},
+                },
+                "admission": {
+                    "in_flight": 12,
+                    "max_in_flight": 200,
+                    "streaming": 3,
+                    "max_streaming": 100,
+                    "rejected": 0,
+                },
+            }
+        }
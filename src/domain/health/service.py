@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from time import monotonic
+
+from tortoise import connections
+
+from external.yandex_disk import (CircuitStateEnum, UpstreamUnavailableError,
+                                   YandexDiskService)
+from utils import SingletonMeta
+
+from .config import HealthConfig as Config
+from .schemas import HealthStatusEnum, ProbeGet
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_status(checks: dict[str, ProbeGet]) -> HealthStatusEnum:
+    statuses = {check.status for check in checks.values()}
+
+    for status in (HealthStatusEnum.failed, HealthStatusEnum.degraded):
+        if status in statuses:
+            return status
+
+    return HealthStatusEnum.ok
+
+
+class HealthService(metaclass=SingletonMeta):
+    """
+    Readiness probes of dependencies. Results are cached for HEALTH_CACHE_TTL,
+    concurrent requests wait for the same run.
+    """
+    yandex_disk_service = YandexDiskService()
+
+    def __init__(self):
+        self.checks: dict[str, ProbeGet] = dict()
+        self.checked_at = float("-inf")
+        self.task: asyncio.Task | None = None
+
+    async def get_checks(self) -> dict[str, ProbeGet]:
+        if monotonic() - self.checked_at < Config.HEALTH_CACHE_TTL:
+            return self.checks
+
+        if self.task is None:
+            self.task = asyncio.create_task(self._run_probes())
+            self.task.add_done_callback(self._forget_task)
+
+        return await asyncio.shield(self.task)
+
+    def _forget_task(self, _: asyncio.Task):
+        self.task = None
+
+    async def _run_probes(self) -> dict[str, ProbeGet]:
+        database, token = await asyncio.gather(self.probe_database(), self.probe_token())
+
+        self.checks = dict(
+            database=database,
+            yandex_disk_token=token,
+            yandex_disk_circuit=self.probe_circuit(),
+        )
+        self.checked_at = monotonic()
+
+        if get_status(self.checks) != HealthStatusEnum.ok:
+            logger.warning("Readiness checks: " + str({name: check.model_dump() for name, check in self.checks.items()}))
+
+        return self.checks
+
+    @staticmethod
+    async def probe_database() -> ProbeGet:
+        """
+        Connection is acquired from pool and answers in HEALTH_DB_TIMEOUT.
+        """
+        try:
+            async with asyncio.timeout(Config.HEALTH_DB_TIMEOUT):
+                await connections.get("default").execute_query("SELECT 1")
+
+        except Exception as e:
+            return ProbeGet(status=HealthStatusEnum.failed, detail=type(e).__name__)
+
+        return ProbeGet(status=HealthStatusEnum.ok)
+
+    async def probe_token(self) -> ProbeGet:
+        """
+        Invalid token can not be fixed by retries, unavailable Yandex Disk is served by fallbacks.
+        """
+        try:
+            valid = await self.yandex_disk_service.ensure_token()
+
+        except UpstreamUnavailableError:
+            return ProbeGet(status=HealthStatusEnum.degraded, detail="unavailable")
+
+        except Exception as e:
+            return ProbeGet(status=HealthStatusEnum.failed, detail=type(e).__name__)
+
+        if not valid:
+            return ProbeGet(status=HealthStatusEnum.failed, detail="invalid")
+
+        return ProbeGet(status=HealthStatusEnum.ok)
+
+    def probe_circuit(self) -> ProbeGet:
+        state = self.yandex_disk_service.breaker.state
+
+        if state != CircuitStateEnum.closed:
+            return ProbeGet(status=HealthStatusEnum.degraded, detail=state.value)
+
+        return ProbeGet(status=HealthStatusEnum.ok)
@@ -0,0 +1,17 @@
+from src.config import BaseConfig
+
+
+class JobsConfig(BaseConfig):
+    JOBS_WORKER_ENABLED: bool = True
+    JOBS_BATCH_SIZE: int = 20
+    JOBS_POLL_INTERVAL: float = 2.0
+
+    JOBS_MAX_ATTEMPTS: int = 12
+    JOBS_BACKOFF_BASE: float = 2.0
+    JOBS_BACKOFF_MAX: float = 300.0
+
+    # Running jobs with expired lock are claimed again (worker crash, restart)
+    JOBS_LOCK_TIMEOUT: int = 5 * 60
+
+
+JobsConfig = JobsConfig()
@@ -0,0 +1,33 @@
+from enum import Enum
+
+from tortoise import fields
+from tortoise.models import Model
+
+
+class JobStatusEnum(str, Enum):
+    pending = "pending"
+    running = "running"
+    failed = "failed"
+
+
+class Job(Model):
+    """
+    Durable background job, removed after successful processing.
+    """
+    id = fields.BigIntField(pk=True)
+    created_at = fields.DatetimeField(auto_now_add=True)
+    updated_at = fields.DatetimeField(auto_now=True)
+
+    kind = fields.CharField(max_length=50)
+    payload = fields.JSONField(default=dict)
+
+    status = fields.CharEnumField(JobStatusEnum, default=JobStatusEnum.pending)
+    attempts = fields.IntField(default=0)
+    run_at = fields.DatetimeField(description="Not processed before this time")
+    locked_until = fields.DatetimeField(null=True)
+    last_error = fields.TextField(null=True)
+
+    class Meta:
+        indexes = [
+            ("status", "run_at"),
+        ]
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from tortoise.expressions import F, Q
+from tortoise.transactions import in_transaction
+
+from src.domain.jobs.models import Job, JobStatusEnum
+from src.utils import SingletonMeta
+
+from .config import JobsConfig as Config
+
+
+logger = logging.getLogger(__name__)
+
+
+# Database writes of done job, run in transaction of the whole batch
+type job_commit = Callable[[], Awaitable[None]]
+type job_handler = Callable[[dict[str, Any]], Awaitable[job_commit | None]]
+type job_result = tuple[Exception | None, job_commit | None]
+
+
+class RetryJob(Exception):
+    """
+    Raise from handler when job can not be done yet, job will be retried with backoff.
+    """
+
+
+class JobsService(metaclass=SingletonMeta):
+    def __init__(self):
+        self.handlers: dict[str, job_handler] = dict()
+
+    def handler(self, kind: str):
+        """
+        Register handler for jobs of provided kind.
+        Handler makes external calls and may return commit function with its database writes.
+        """
+        def decorator(function: job_handler) -> job_handler:
+            self.handlers[kind] = function
+            return function
+
+        return decorator
+
+    async def enqueue(self, kind: str, payload: dict[str, Any], delay: float = 0) -> Job:
+        job = await Job.create(
+            kind=kind,
+            payload=payload,
+            run_at=datetime.now(timezone.utc) + timedelta(seconds=delay),
+        )
+
+        logger.info("Job enqueued: " + str(dict(id=job.id, kind=kind, payload=payload)))
+        return job
+
+    async def process_batch(self, batch_size: int = Config.JOBS_BATCH_SIZE) -> int:
+        """
+        Claim, process and commit one batch of jobs. Returns count of claimed jobs.
+        """
+        jobs = await self._claim(batch_size)
+
+        if not jobs:
+            return 0
+
+        results = await asyncio.gather(*(self._run(job) for job in jobs))
+        await self._commit(jobs, results)
+
+        return len(jobs)
+
+    async def _claim(self, batch_size: int) -> list[Job]:
+        now = datetime.now(timezone.utc)
+
+        async with in_transaction():
+            jobs = await (
+                Job
+                .filter(
+                    Q(status=JobStatusEnum.pending, run_at__lte=now)
+                    | Q(status=JobStatusEnum.running, locked_until__lt=now)
+                )
+                .order_by("run_at")
+                .limit(batch_size)
+                .select_for_update(skip_locked=True)
+            )
+
+            if jobs:
+                await Job.filter(id__in=[job.id for job in jobs]).update(
+                    status=JobStatusEnum.running,
+                    attempts=F("attempts") + 1,
+                    locked_until=now + timedelta(seconds=Config.JOBS_LOCK_TIMEOUT),
+                )
+
+        for job in jobs:
+            job.attempts += 1
+
+        return jobs
+
+    async def _run(self, job: Job) -> job_result:
+        handler = self.handlers.get(job.kind)
+
+        if handler is None:
+            return LookupError(f"No handler for job kind: {job.kind}"), None
+
+        try:
+            return None, await handler(job.payload)
+
+        except Exception as e:
+            return e, None
+
+    async def _commit(self, jobs: list[Job], results: list[job_result]):
+        """
+        Save results of batch in one transaction: writes of done jobs, deletion and rescheduling.
+        If it fails, jobs are committed one by one, failed commit reschedules its job.
+        """
+        try:
+            await self._commit_batch(jobs, results)
+
+        except Exception:
+            logger.exception("Jobs batch commit failed, commit jobs one by one")
+
+            for job, result in zip(jobs, results):
+                try:
+                    await self._commit_batch([job], [result])
+
+                except Exception as e:
+                    await self._commit_batch([job], [(e, None)])
+
+        done = sum(1 for error, _ in results if error is None)
+        logger.info(f"Jobs batch processed: {done} done, {len(jobs) - done} rescheduled or failed")
+
+    async def _commit_batch(self, jobs: list[Job], results: list[job_result]):
+        done_ids = [job.id for job, (error, _) in zip(jobs, results) if error is None]
+
+        async with in_transaction():
+            for error, commit in results:
+                if error is None and commit is not None:
+                    await commit()
+
+            if done_ids:
+                await Job.filter(id__in=done_ids).delete()
+
+            for job, (error, _) in zip(jobs, results):
+                if error is not None:
+                    await self._reschedule(job, error)
+
+    async def _reschedule(self, job: Job, error: Exception):
+        job.last_error = repr(error)
+        job.locked_until = None
+
+        if job.attempts >= Config.JOBS_MAX_ATTEMPTS:
+            job.status = JobStatusEnum.failed
+            logger.error("Job failed: " + str(dict(id=job.id, kind=job.kind, error=job.last_error)))
+
+        else:
+            job.status = JobStatusEnum.pending
+            job.run_at = datetime.now(timezone.utc) + timedelta(seconds=self._backoff(job.attempts))
+
+            if not isinstance(error, RetryJob):
+                logger.warning("Job error, retry: " + str(dict(id=job.id, kind=job.kind, error=job.last_error)))
+
+        await job.save(update_fields=["status", "run_at", "locked_until", "last_error", "updated_at"])
+
+    @staticmethod
+    def _backoff(attempts: int) -> float:
+        delay = min(Config.JOBS_BACKOFF_BASE * 2 ** (attempts - 1), Config.JOBS_BACKOFF_MAX)
+        return delay / 2 + random.uniform(0, delay / 2)
@@ -0,0 +1,64 @@
+import asyncio
+import logging
+
+from src.utils import SingletonMeta
+
+from .config import JobsConfig as Config
+from .service import JobsService
+
+
+logger = logging.getLogger(__name__)
+
+
+class JobsWorker(metaclass=SingletonMeta):
+    """
+    Polls jobs table in background task of current process.
+    """
+    def __init__(self):
+        self.task: asyncio.Task | None = None
+
+    async def run(self):
+        service = JobsService()
+
+        while True:
+            try:
+                # Take next batch at once if current one was full
+                if await service.process_batch() >= Config.JOBS_BATCH_SIZE:
+                    continue
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception:
+                logger.exception("Jobs worker iteration failed")
+
+            await asyncio.sleep(Config.JOBS_POLL_INTERVAL)
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+            logger.info("Jobs worker started")
+
+    async def stop(self):
+        if self.task is None:
+            return
+
+        self.task.cancel()
+
+        try:
+            await self.task
+
+        except asyncio.CancelledError:
+            pass
+
+        self.task = None
+        logger.info("Jobs worker stopped")
+
+
+async def jobs_worker_startup():
+    if Config.JOBS_WORKER_ENABLED:
+        JobsWorker().start()
+
+
+async def jobs_worker_shutdown():
+    await JobsWorker().stop()
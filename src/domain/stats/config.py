@@ -0,0 +1,14 @@
+from src.config import BaseConfig
+
+
+class StatsConfig(BaseConfig):
+    STATS_ENABLED: bool = True
+    STATS_FLUSH_INTERVAL: float = 10.0
+    STATS_BUCKET_SECONDS: int = 60 * 60
+
+    # Counters kept while database is unavailable, newer ones are dropped after this
+    STATS_MAX_PENDING_KEYS: int = 100_000
+    STATS_TOP_MAX_LIMIT: int = 100
+
+
+StatsConfig = StatsConfig()
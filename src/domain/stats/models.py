@@ -0,0 +1,20 @@
+from tortoise import fields
+from tortoise.models import Model
+
+
+class FileDownloads(Model):
+    """
+    Downloads of file per time bucket. Not linked by foreign key: counters are written in batches.
+    """
+    id = fields.BigIntField(pk=True)
+
+    file_id = fields.UUIDField()
+    bucket = fields.DatetimeField(description="Start of time bucket")
+    downloads = fields.BigIntField(default=0)
+
+    class Meta:
+        table = "file_downloads"
+        unique_together = (("file_id", "bucket"),)
+        indexes = [
+            ("bucket",),
+        ]
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi_restful.cbv import cbv
+
+from domain.files.dependencies import validate_file
+from infrastructure.auth import admin_access
+from infrastructure.route.headers import NO_CACHE_HEADER
+
+from src.domain.files.models import File
+from src.infrastructure.route.responses import SchemaResponse
+
+from .config import StatsConfig as Config
+from .schemas import (DownloadsBucketGet, DownloadsSeriesGet,
+                      FileDownloadsGet, TopDownloadsGet)
+from .service import DownloadsCounter, get_bucket
+
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+DEFAULT_PERIOD = timedelta(days=1)
+
+
+def get_period(since: datetime | None, until: datetime | None) -> tuple[datetime, datetime]:
+    """
+    Start is aligned to bucket, which contains it.
+    """
+    until = until or datetime.now(timezone.utc)
+    return get_bucket(since or until - DEFAULT_PERIOD), until
+
+
+@cbv(router)
+class StatsView:
+    counter = DownloadsCounter()
+
+    @router.get("/top", response_model=TopDownloadsGet)
+    @admin_access()
+    async def get_top(
+        self,
+        request: Request,
+        since: datetime | None = Query(None, description="Last day by default"),
+        until: datetime | None = Query(None),
+        limit: int = Query(20, ge=1, le=Config.STATS_TOP_MAX_LIMIT),
+    ):
+        """
+        Most downloaded files. Counters are written with delay, see STATS_FLUSH_INTERVAL.
+        Redirects served from nginx cache are not counted, hot files are undercounted.
+        """
+        since, until = get_period(since, until)
+        rows = await self.counter.get_top(since, until, limit)
+        files = {
+            file.id: file
+            for file in await File.filter(id__in=[row["file_id"] for row in rows]).only("id", "slug", "title")
+        }
+
+        items = [
+            FileDownloadsGet(
+                file_id=row["file_id"],
+                slug=getattr(files.get(row["file_id"]), "slug", None),
+                title=getattr(files.get(row["file_id"]), "title", None),
+                downloads=row["total"],
+            )
+            for row in rows
+        ]
+
+        return SchemaResponse(
+            TopDownloadsGet(since=since, until=until, items=items),
+            headers={**NO_CACHE_HEADER},
+        )
+
+    @router.get("/files/{identifier}", response_model=DownloadsSeriesGet)
+    @admin_access()
+    async def get_series(
+        self,
+        request: Request,
+        since: datetime | None = Query(None, description="Last day by default"),
+        until: datetime | None = Query(None),
+        file: File = Depends(validate_file),
+    ):
+        """
+        Downloads of file by time buckets, buckets without downloads are skipped.
+        """
+        since, until = get_period(since, until)
+        buckets = await self.counter.get_series(file.id, since, until)
+
+        return SchemaResponse(
+            DownloadsSeriesGet(
+                file_id=file.id,
+                bucket_seconds=Config.STATS_BUCKET_SECONDS,
+                items=[DownloadsBucketGet.model_validate(bucket) for bucket in buckets],
+            ),
+            headers={**NO_CACHE_HEADER},
+        )
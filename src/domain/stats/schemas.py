@@ -0,0 +1,48 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class FileDownloadsGet(BaseModel):
+    file_id: UUID
+    slug: Optional[str] = None
+    title: Optional[str] = None
+    downloads: int
+
+
+class TopDownloadsGet(BaseModel):
+    since: datetime
+    until: datetime
+    items: list[FileDownloadsGet]
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "since": "2024-08-19T00:00:00Z",
+                "until": "2024-08-20T00:00:00Z",
+                "items": [
+                    {
+                        "file_id": "123e4567-e89b-12d3-a456-426614174000",
+                        "slug": "example-slug",
+                        "title": "Example title",
+                        "downloads": 1234,
+                    }
+                ],
+            }
+        }
+
+
+class DownloadsBucketGet(BaseModel):
+    bucket: datetime
+    downloads: int
+
+    class Config:
+        from_attributes = True
+
+
+class DownloadsSeriesGet(BaseModel):
+    file_id: UUID
+    bucket_seconds: int
+    items: list[DownloadsBucketGet]
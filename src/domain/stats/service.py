@@ -0,0 +1,93 @@
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from uuid import UUID
+
+from tortoise import connections
+from tortoise.functions import Sum
+
+from src.domain.stats.models import FileDownloads
+from src.utils import SingletonMeta
+
+from .config import StatsConfig as Config
+
+
+logger = logging.getLogger(__name__)
+
+
+type file_id = UUID
+type bucket = datetime
+
+
+# One statement for whole batch, parameters count does not depend on batch size
+FLUSH_QUERY = (
+    'INSERT INTO "file_downloads" ("file_id", "bucket", "downloads") '
+    'SELECT * FROM unnest($1::uuid[], $2::timestamptz[], $3::bigint[]) '
+    'ON CONFLICT ("file_id", "bucket") DO UPDATE '
+    'SET "downloads" = "file_downloads"."downloads" + EXCLUDED."downloads"'
+)
+
+
+def get_bucket(moment: datetime) -> bucket:
+    timestamp = int(moment.timestamp())
+    return datetime.fromtimestamp(timestamp - timestamp % Config.STATS_BUCKET_SECONDS, timezone.utc)
+
+
+class DownloadsCounter(metaclass=SingletonMeta):
+    """
+    Counts downloads in memory of current process, counters are written to database by flush.
+    Only downloads, which reach backend, are counted: redirects from nginx cache are not.
+    """
+    def __init__(self):
+        self.counts: Counter[tuple[file_id, bucket]] = Counter()
+
+    def hit(self, file_id: file_id):
+        if not Config.STATS_ENABLED:
+            return
+
+        key = (file_id, get_bucket(datetime.now(timezone.utc)))
+
+        if key in self.counts or len(self.counts) < Config.STATS_MAX_PENDING_KEYS:
+            self.counts[key] += 1
+
+    async def flush(self) -> int:
+        """
+        Write collected counters by one query. Returns count of written rows.
+        """
+        if not self.counts:
+            return 0
+
+        counts, self.counts = self.counts, Counter()
+        file_ids, buckets, downloads = zip(*((key[0], key[1], count) for key, count in counts.items()))
+
+        try:
+            await connections.get("default").execute_query(FLUSH_QUERY, [list(file_ids), list(buckets), list(downloads)])
+
+        except Exception:
+            # Keep counters for next flush, hits counted meanwhile are added
+            for key, count in counts.items():
+                if key in self.counts or len(self.counts) < Config.STATS_MAX_PENDING_KEYS:
+                    self.counts[key] += count
+
+            raise
+
+        logger.info("Downloads stats flushed: " + str(dict(rows=len(counts), downloads=sum(downloads))))
+        return len(counts)
+
+    async def get_top(self, since: datetime, until: datetime, limit: int) -> list[dict]:
+        return await (
+            FileDownloads
+            .filter(bucket__gte=since, bucket__lt=until)
+            .annotate(total=Sum("downloads"))
+            .group_by("file_id")
+            .order_by("-total")
+            .limit(limit)
+            .values("file_id", "total")
+        )
+
+    async def get_series(self, file_id: file_id, since: datetime, until: datetime) -> list[FileDownloads]:
+        return await (
+            FileDownloads
+            .filter(file_id=file_id, bucket__gte=since, bucket__lt=until)
+            .order_by("bucket")
+        )
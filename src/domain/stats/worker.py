@@ -0,0 +1,70 @@
+import asyncio
+import logging
+
+from src.utils import SingletonMeta
+
+from .config import StatsConfig as Config
+from .service import DownloadsCounter
+
+
+logger = logging.getLogger(__name__)
+
+
+class StatsWorker(metaclass=SingletonMeta):
+    """
+    Flushes download counters of current process periodically.
+    """
+    def __init__(self):
+        self.task: asyncio.Task | None = None
+
+    async def run(self):
+        counter = DownloadsCounter()
+
+        while True:
+            await asyncio.sleep(Config.STATS_FLUSH_INTERVAL)
+
+            try:
+                await counter.flush()
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception:
+                logger.exception("Downloads stats flush failed")
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+            logger.info("Stats worker started")
+
+    async def stop(self):
+        if self.task is None:
+            return
+
+        self.task.cancel()
+
+        try:
+            await self.task
+
+        except asyncio.CancelledError:
+            pass
+
+        self.task = None
+
+        # Counters collected after last flush
+        try:
+            await DownloadsCounter().flush()
+
+        except Exception:
+            logger.exception("Final downloads stats flush failed")
+
+        logger.info("Stats worker stopped")
+
+
+async def stats_worker_startup():
+    if Config.STATS_ENABLED:
+        StatsWorker().start()
+
+
+async def stats_worker_shutdown():
+    await StatsWorker().stop()
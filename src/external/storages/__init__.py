@@ -0,0 +1,11 @@
+from .backends import LocalDiskStorage, StorageBackend, YandexDiskStorage
+from .service import PRIMARY_STORAGE, StoragesService
+
+
+__all__ = [
+    "LocalDiskStorage",
+    "StorageBackend",
+    "YandexDiskStorage",
+    "PRIMARY_STORAGE",
+    "StoragesService",
+]
@@ -0,0 +1,174 @@
+import asyncio
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from time import time
+from typing import AsyncIterator
+from urllib.parse import quote, urlencode
+
+from external.yandex_disk import YandexDiskService
+from infrastructure.auth import sign_path
+
+from .config import StoragesConfig as Config
+
+
+LOCAL_LINK_PREFIX = "/s/local"
+
+
+class StorageBackend(ABC):
+    # Links of local storage are served by this server, remote ones by storage itself
+    local: bool = False
+
+    def __init__(self, name: str):
+        self.name = name
+
+    @abstractmethod
+    async def upload(self, content: bytes | AsyncIterator[bytes], path: str):
+        """
+        Upload content, async iterator is streamed by chunks.
+        """
+        ...
+
+    @abstractmethod
+    async def download(self, path: str) -> bytes:
+        ...
+
+    @abstractmethod
+    async def get_download_link(self, path: str) -> str:
+        ...
+
+    @abstractmethod
+    async def remove(self, path: str):
+        ...
+
+    def has_cached_link(self, path: str) -> bool:
+        """
+        Link is returned without storage request, its latency says nothing about storage.
+        """
+        return False
+
+
+class YandexDiskStorage(StorageBackend):
+    def __init__(self, name: str, service: YandexDiskService):
+        super().__init__(name)
+        self.service = service
+
+    async def upload(self, content: bytes | AsyncIterator[bytes], path: str):
+        await self.service.upload_file(content, path)
+
+    async def download(self, path: str) -> bytes:
+        return await self.service.download(path)
+
+    async def iter_content(self, path: str) -> AsyncIterator[bytes]:
+        link = await self.service.get_download_link(path)
+
+        async for chunk in self.service.iter_link_content(link):
+            yield chunk
+
+    async def get_download_link(self, path: str) -> str:
+        return await self.service.get_download_link(path)
+
+    def has_cached_link(self, path: str) -> bool:
+        return self.service.links_cache.get(path) is not None
+
+    async def remove(self, path: str):
+        await self.service.remove(path, throw_not_found=False, permanently=True)
+
+
+class LocalDiskStorage(StorageBackend):
+    """
+    Files in local directory, downloaded by signed links to this server.
+    """
+    local = True
+
+    def __init__(self, name: str, root: str):
+        super().__init__(name)
+        self.root = os.path.abspath(root)
+
+    def full_path(self, path: str) -> str:
+        full_path = os.path.abspath(os.path.join(self.root, path))
+
+        if os.path.commonpath([self.root, full_path]) != self.root:
+            raise ValueError(f"Path is outside of storage root: {path}")
+
+        return full_path
+
+    async def upload(self, content: bytes | AsyncIterator[bytes], path: str):
+        full_path = self.full_path(path)
+
+        if isinstance(content, bytes):
+            await asyncio.to_thread(self._write, full_path, content)
+            return
+
+        await asyncio.to_thread(os.makedirs, os.path.dirname(full_path), exist_ok=True)
+
+        # Readers never see partially written file
+        descriptor, temp_path = await asyncio.to_thread(
+            tempfile.mkstemp, dir=os.path.dirname(full_path), prefix=".upload-",
+        )
+
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                async for chunk in content:
+                    await asyncio.to_thread(file.write, chunk)
+
+            await asyncio.to_thread(os.replace, temp_path, full_path)
+
+        except BaseException:
+            await asyncio.to_thread(self._unlink, temp_path)
+            raise
+
+    async def download(self, path: str) -> bytes:
+        return await asyncio.to_thread(self._read, self.full_path(path))
+
+    async def get_download_link(self, path: str) -> str:
+        if not await asyncio.to_thread(os.path.isfile, self.full_path(path)):
+            raise FileNotFoundError(path)
+
+        expires = int(time()) + Config.STORAGE_LOCAL_LINK_TTL
+        signature = sign_path(Config.signed_url_secret, self.signed_path(path), expires)
+        query = urlencode(dict(exp=expires, sig=signature))
+
+        return f"{Config.STORAGE_PUBLIC_BASE_URL}{LOCAL_LINK_PREFIX}/{quote(self.signed_path(path))}?{query}"
+
+    async def remove(self, path: str):
+        full_path = self.full_path(path)
+
+        if await asyncio.to_thread(os.path.isdir, full_path):
+            await asyncio.to_thread(shutil.rmtree, full_path, True)
+        else:
+            await asyncio.to_thread(self._unlink, full_path)
+
+    def signed_path(self, path: str) -> str:
+        return f"{self.name}/{path}"
+
+    @staticmethod
+    def _write(full_path: str, content: bytes):
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+
+        # Readers never see partially written file
+        descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(full_path), prefix=".upload-")
+
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(content)
+
+            os.replace(temp_path, full_path)
+
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    @staticmethod
+    def _read(full_path: str) -> bytes:
+        with open(full_path, "rb") as file:
+            return file.read()
+
+    @staticmethod
+    def _unlink(full_path: str):
+        try:
+            os.unlink(full_path)
+
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,20 @@
+from config import BaseConfig
+
+
+class StoragesConfig(BaseConfig):
+    # Secondary storages with file replicas, JSON list, for example:
+    # [{"name": "yandex-2", "type": "yandex_disk", "refresh_token": "...", "client_id": "...", "client_secret": "..."},
+    #  {"name": "local", "type": "local", "root": "/data/files"}]
+    STORAGE_REPLICAS: list[dict] = []
+
+    # Links to local storage files: base url (relative links if blank), lifetime. Signed by SIGNED_URL_SECRET
+    STORAGE_PUBLIC_BASE_URL: str = ""
+    STORAGE_LOCAL_LINK_TTL: int = 60 * 60
+
+    # Weight of new sample in latency moving average
+    STORAGE_LATENCY_ALPHA: float = 0.2
+    # Storage is tried after healthy ones for this time after failure
+    STORAGE_FAILURE_COOLDOWN: float = 30.0
+
+
+StoragesConfig = StoragesConfig()
@@ -0,0 +1,115 @@
+import logging
+from dataclasses import dataclass
+from time import monotonic
+
+from external.yandex_disk import YandexDiskService
+from utils import SingletonMeta
+
+from .backends import LocalDiskStorage, StorageBackend, YandexDiskStorage
+from .config import StoragesConfig as Config
+
+
+logger = logging.getLogger(__name__)
+
+# Storage of File.path, default Yandex Disk account
+PRIMARY_STORAGE = "primary"
+
+
+@dataclass
+class StorageHealth:
+    # Moving average of download link latency, seconds
+    latency: float | None = None
+    failed_until: float = 0.0
+
+
+def create_storage(settings: dict) -> StorageBackend:
+    match settings.get("type"):
+        case "yandex_disk":
+            service = YandexDiskService.for_account(
+                settings["name"],
+                refresh_token=settings["refresh_token"],
+                client_id=settings["client_id"],
+                client_secret=settings["client_secret"],
+            )
+            return YandexDiskStorage(settings["name"], service)
+
+        case "local":
+            return LocalDiskStorage(settings["name"], settings["root"])
+
+    raise ValueError(f"Unknown storage type: {settings.get('type')}")
+
+
+class StoragesService(metaclass=SingletonMeta):
+    """
+    Primary storage and replicas, download links from the healthy remote one with the lowest latency.
+    Latency is sampled by link requests to storage only, cached links are not counted.
+    Local storages are the last resort: their downloads are served by this server.
+    """
+    def __init__(self):
+        self.primary = YandexDiskStorage(PRIMARY_STORAGE, YandexDiskService())
+        self.replicas: dict[str, StorageBackend] = {
+            settings["name"]: create_storage(settings) for settings in Config.STORAGE_REPLICAS
+        }
+        self.health: dict[str, StorageHealth] = {
+            name: StorageHealth() for name in [PRIMARY_STORAGE, *self.replicas]
+        }
+
+    def get(self, name: str) -> StorageBackend | None:
+        if name == PRIMARY_STORAGE:
+            return self.primary
+
+        return self.replicas.get(name)
+
+    def rank(self, names: list[str]) -> list[StorageBackend]:
+        """
+        Healthy first, then remote, then by link latency. Storage without samples goes first among them, to get one.
+        Link latency of local storage is about zero, but its transfer holds a worker, so it is ranked after remote ones.
+        """
+        now = monotonic()
+        storages = [storage for storage in map(self.get, dict.fromkeys(names)) if storage is not None]
+
+        def key(item: tuple[int, StorageBackend]):
+            index, storage = item
+            health = self.health[storage.name]
+            return health.failed_until > now, storage.local, health.latency or 0.0, index
+
+        return [storage for _, storage in sorted(enumerate(storages), key=key)]
+
+    async def get_download_link(self, path: str, replicas: list[str]) -> str:
+        """
+        Try primary storage and replicas of file in rank order.
+        """
+        error = None
+
+        for storage in self.rank([PRIMARY_STORAGE, *replicas]):
+            # Cache hit takes microseconds, its sample would keep the storage first for good
+            cached = storage.has_cached_link(path)
+            started = monotonic()
+
+            try:
+                link = await storage.get_download_link(path)
+
+            except Exception as e:
+                self.record_failure(storage.name)
+                logger.warning("Download link failed: " + str(dict(storage=storage.name, path=path, error=repr(e))))
+                error = e
+                continue
+
+            if not cached:
+                self.record_latency(storage.name, monotonic() - started)
+
+            return link
+
+        raise error
+
+    def record_latency(self, name: str, latency: float):
+        health = self.health[name]
+        health.failed_until = 0.0
+
+        if health.latency is None:
+            health.latency = latency
+        else:
+            health.latency += Config.STORAGE_LATENCY_ALPHA * (latency - health.latency)
+
+    def record_failure(self, name: str):
+        self.health[name].failed_until = monotonic() + Config.STORAGE_FAILURE_COOLDOWN
@@ -1,6 +1,9 @@
+from .resilience import CircuitStateEnum, UpstreamUnavailableError
 from .service import YandexDiskService
 
 
 __all__ = [
-    "YandexDiskService"
+    "CircuitStateEnum",
+    "UpstreamUnavailableError",
+    "YandexDiskService",
 ]
@@ -0,0 +1,86 @@
+from collections import OrderedDict, defaultdict
+from time import time
+
+
+def _directories(path: str) -> list[str]:
+    """
+    "a/b/c.txt" -> ["a", "a/b"]
+    """
+    parts = path.split("/")[:-1]
+    return ["/".join(parts[:index]) for index in range(1, len(parts) + 1)]
+
+
+class DownloadLinksCache:
+    """
+    LRU cache of download links with expiration time.
+    Expired links are kept for `stale_ttl` more, to be served while storage API is unavailable.
+    Paths are indexed by their directories, to forget directory without scan of whole cache.
+    """
+    def __init__(self, ttl: int, max_size: int, stale_ttl: int = 0):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.stale_ttl = stale_ttl
+        self._links: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._directories: defaultdict[str, set[str]] = defaultdict(set)
+
+    def get(self, path: str) -> tuple[str, float] | None:
+        """
+        Returns link and expiration timestamp.
+        """
+        item = self._links.get(path)
+
+        if item is None:
+            return None
+
+        if item[1] <= time():
+            if item[1] + self.stale_ttl <= time():
+                self.forget(path)
+
+            return None
+
+        self._links.move_to_end(path)
+        return item
+
+    def get_stale(self, path: str) -> tuple[str, float] | None:
+        """
+        Link, which is expired, but is still in stale period.
+        """
+        item = self._links.get(path)
+
+        if item is None or item[1] + self.stale_ttl <= time():
+            return None
+
+        return item[0], item[1] + self.stale_ttl
+
+    def set(self, path: str, link: str) -> tuple[str, float]:
+        item = (link, time() + self.ttl)
+
+        if path not in self._links:
+            for directory in _directories(path):
+                self._directories[directory].add(path)
+
+        self._links[path] = item
+        self._links.move_to_end(path)
+
+        while len(self._links) > self.max_size:
+            self.forget(next(iter(self._links)))
+
+        return item
+
+    def forget(self, path: str):
+        if self._links.pop(path, None) is None:
+            return
+
+        for directory in _directories(path):
+            paths = self._directories[directory]
+            paths.discard(path)
+
+            if not paths:
+                del self._directories[directory]
+
+    def forget_directory(self, directory: str):
+        """
+        Forget links of all paths inside of directory, recursively.
+        """
+        for path in list(self._directories.get(directory.rstrip("/"), ())):
+            self.forget(path)
@@ -1,5 +1,3 @@
-from typing import Literal
-
 from dotenv import load_dotenv
 
 from config import BaseConfig
@@ -12,7 +10,36 @@ class YandexDiskConfig(BaseConfig):
     YANDEX_API_CLIENT_ID: str
     YANDEX_API_CLIENT_SECRET: str
 
-    YANDEX_API_OAUTH_BASE_URL: Literal["https://oauth.yandex.ru"] = "https://oauth.yandex.ru"
+    # Overridden only for local stand-in, see benchmarks
+    YANDEX_API_BASE_URL: str = "https://cloud-api.yandex.net"
+    YANDEX_API_OAUTH_BASE_URL: str = "https://oauth.yandex.ru"
+
+    # Download links are valid for several hours, keep them less
+    YANDEX_DOWNLOAD_LINK_TTL: int = 30 * 60
+    YANDEX_DOWNLOAD_LINK_CACHE_SIZE: int = 10_000
+    # Expired links are still served while Yandex Disk is unavailable
+    YANDEX_DOWNLOAD_LINK_STALE_TTL: int = 2 * 60 * 60
+
+    # Seconds per attempt: API call, transfer of content, pause between streamed chunks
+    YANDEX_TIMEOUT: float = 10.0
+    YANDEX_TRANSFER_TIMEOUT: float = 300.0
+    YANDEX_READ_TIMEOUT: float = 30.0
+
+    # Retries of idempotent calls, backoff is randomized: [0, base * 2^attempt]
+    YANDEX_RETRIES: int = 2
+    YANDEX_RETRY_BACKOFF: float = 0.2
+
+    # Second download link request, if first is slower than p95 of recent ones (clamped)
+    YANDEX_HEDGE_ENABLED: bool = True
+    YANDEX_HEDGE_MIN_DELAY: float = 0.05
+    YANDEX_HEDGE_MAX_DELAY: float = 2.0
+
+    # Transient errors in a row to open circuit, seconds before probe call
+    YANDEX_BREAKER_FAILURES: int = 5
+    YANDEX_BREAKER_RESET_TIMEOUT: float = 30.0
+
+    # Token is checked by extra request not more often, expired one is refreshed on UnauthorizedError anyway
+    YANDEX_TOKEN_CHECK_INTERVAL: int = 5 * 60
 
 
 YandexDiskConfig = YandexDiskConfig()
@@ -0,0 +1,279 @@
+"""
+Deadlines, retries, hedged requests and circuit breaker for Yandex Disk calls.
+"""
+import asyncio
+import logging
+import random
+from collections import deque
+from contextvars import ContextVar
+from enum import Enum
+from functools import wraps
+from time import monotonic
+from typing import Awaitable, Callable
+
+import aiohttp
+import yadisk
+
+from .config import YandexDiskConfig as Config
+
+
+logger = logging.getLogger(__name__)
+
+# Upstream is slow or failing, other errors (not found, conflict, unauthorized...) mean it works
+TRANSIENT_ERRORS = (
+    TimeoutError,
+    aiohttp.ClientConnectionError,
+    aiohttp.ClientPayloadError,
+    yadisk.exceptions.RequestError,
+    yadisk.exceptions.RetriableYaDiskError,
+    yadisk.exceptions.TooManyRequestsError,
+)
+
+HEDGE_QUANTILE = 0.95
+
+# Calls made from inside of protected call get own deadline and hedge, but are retried and counted by outer one
+_protected_call: ContextVar[bool] = ContextVar("yandex_disk_protected_call", default=False)
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Response errors are transient only for 5xx and 429, others (403, 404, 410 of stale link...) are final.
+    """
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status >= 500 or error.status == 429
+
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+class UpstreamUnavailableError(Exception):
+    """
+    Yandex Disk is unavailable: circuit breaker is open or call failed after retries.
+    """
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitStateEnum(str, Enum):
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Opens after `failures` transient errors in a row, fails fast while open.
+    After `reset_timeout` lets one probe call in: success closes, failure opens again.
+    """
+    def __init__(self, failures: int, reset_timeout: float):
+        self.failures = failures
+        self.reset_timeout = reset_timeout
+
+        self.failed = 0
+        self.opened_at: float | None = None
+        self.probing = False
+
+    @property
+    def state(self) -> CircuitStateEnum:
+        if self.opened_at is None:
+            return CircuitStateEnum.closed
+
+        if monotonic() - self.opened_at < self.reset_timeout:
+            return CircuitStateEnum.open
+
+        return CircuitStateEnum.half_open
+
+    @property
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+
+        return max(self.reset_timeout - (monotonic() - self.opened_at), 1.0)
+
+    def before_call(self):
+        state = self.state
+
+        if state == CircuitStateEnum.open or (state == CircuitStateEnum.half_open and self.probing):
+            raise UpstreamUnavailableError("Yandex Disk circuit is open", self.retry_after)
+
+        if state == CircuitStateEnum.half_open:
+            self.probing = True
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.warning("Yandex Disk circuit closed")
+
+        self.failed = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self):
+        self.failed += 1
+
+        if self.probing or (self.opened_at is None and self.failed >= self.failures):
+            logger.warning("Yandex Disk circuit opened: " + str(dict(failed=self.failed)))
+            self.opened_at = monotonic()
+
+        self.probing = False
+
+    def release(self):
+        """
+        Call was cancelled, result is unknown.
+        """
+        self.probing = False
+
+
+class LatencyTracker:
+    """
+    Latencies of last `size` successful calls.
+    """
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.samples: deque[float] = deque(maxlen=size)
+        self.min_samples = min_samples
+
+    def add(self, value: float):
+        self.samples.append(value)
+
+    def quantile(self, value: float) -> float | None:
+        if len(self.samples) < self.min_samples:
+            return None
+
+        samples = sorted(self.samples)
+        return samples[min(int(len(samples) * value), len(samples) - 1)]
+
+
+def protected_call(timeout: float | None = None, retries: int = 0, hedge: bool = False):
+    """
+    Run method of service with `breaker` attribute, with deadline per attempt and circuit breaker.
+    Transient errors are retried with jittered exponential backoff, use retries only for idempotent methods.
+    With `hedge` second request is sent if first one is slower than 95th percentile of recent ones.
+    Nested protected call has own deadline and hedge, its errors are retried and counted by outer call.
+    """
+    tracker = LatencyTracker() if hedge else None
+
+    def decorator(method):
+        @wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            if _protected_call.get():
+                return await _attempt(
+                    call=lambda: method(self, *args, **kwargs),
+                    breaker=None,
+                    timeout=timeout or Config.YANDEX_TIMEOUT,
+                    tracker=tracker if Config.YANDEX_HEDGE_ENABLED else None,
+                )
+
+            context_token = _protected_call.set(True)
+
+            try:
+                return await _call_with_retries(
+                    call=lambda: method(self, *args, **kwargs),
+                    breaker=self.breaker,
+                    timeout=timeout or Config.YANDEX_TIMEOUT,
+                    retries=retries,
+                    tracker=tracker if Config.YANDEX_HEDGE_ENABLED else None,
+                    name=method.__name__,
+                )
+
+            finally:
+                _protected_call.reset(context_token)
+
+        return wrapper
+
+    return decorator
+
+
+async def _call_with_retries(
+    call: Callable[[], Awaitable],
+    breaker: CircuitBreaker,
+    timeout: float,
+    retries: int,
+    tracker: LatencyTracker | None,
+    name: str,
+):
+    for attempt in range(retries + 1):
+        try:
+            return await _attempt(call, breaker, timeout, tracker)
+
+        except Exception as e:
+            if not is_transient(e):
+                raise
+
+            if attempt == retries:
+                logger.error(f"Yandex Disk call failed: {name}, attempts: {attempt + 1}, error: {e!r}")
+                raise UpstreamUnavailableError(f"Yandex Disk call failed: {name}", breaker.retry_after or 1.0) from e
+
+            delay = random.uniform(0, Config.YANDEX_RETRY_BACKOFF * 2 ** attempt)
+            logger.warning(f"Retry Yandex Disk call: {name}, attempt: {attempt + 1}, error: {e!r}")
+
+            await asyncio.sleep(delay)
+
+
+async def _attempt(
+    call: Callable[[], Awaitable],
+    breaker: CircuitBreaker | None,
+    timeout: float,
+    tracker: LatencyTracker | None,
+):
+    """
+    One call with deadline, without `breaker` errors are left to outer call.
+    """
+    if breaker:
+        breaker.before_call()
+
+    started = monotonic()
+
+    try:
+        async with asyncio.timeout(timeout):
+            result = await (_hedged(call, tracker) if tracker else call())
+
+    except asyncio.CancelledError:
+        if breaker:
+            breaker.release()
+
+        raise
+
+    except Exception as e:
+        if breaker and is_transient(e):
+            breaker.record_failure()
+
+        elif breaker:
+            breaker.record_success()
+
+        raise
+
+    if breaker:
+        breaker.record_success()
+
+    if tracker:
+        tracker.add(monotonic() - started)
+
+    return result
+
+
+async def _hedged(call: Callable[[], Awaitable], tracker: LatencyTracker):
+    delay = tracker.quantile(HEDGE_QUANTILE) or Config.YANDEX_HEDGE_MAX_DELAY
+    delay = min(max(delay, Config.YANDEX_HEDGE_MIN_DELAY), Config.YANDEX_HEDGE_MAX_DELAY)
+
+    tasks = {asyncio.ensure_future(call())}
+    error = None
+
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+
+        if not done:
+            tasks.add(asyncio.ensure_future(call()))
+
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+
+                error = task.exception()
+
+        raise error
+
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -1,17 +1,27 @@
+import asyncio
 import logging
 import os
 from functools import wraps
+from time import monotonic, time
+from typing import AsyncIterator
 
 import aiohttp
 import yadisk
 
 from utils import SingletonMeta
 
+from .cache import DownloadLinksCache
 from .config import YandexDiskConfig as Config
+from .resilience import (CircuitBreaker, UpstreamUnavailableError,
+                         protected_call)
 
 
 logger = logging.getLogger(__name__)
 
+yadisk.settings.BASE_API_URL = Config.YANDEX_API_BASE_URL
+# Retries are made by protected_call, with backoff and circuit breaker
+yadisk.settings.DEFAULT_N_RETRIES = 0
+
 
 def handle_unauthorized_error(method):
     """
@@ -19,25 +29,33 @@ def handle_unauthorized_error(method):
     """
     @wraps(method)
     async def wrapper(self, *args, **kwargs):
+        client = self.client
+
         try:
             return await method(self, *args, **kwargs)
 
         except yadisk.exceptions.UnauthorizedError:
             logger.warning(f"Get UnauthorizedError, recall method: {method.__name__}")
 
-            await YandexDiskService().init_client()
+            await self.init_client(stale_client=client)
             return await method(self, *args, **kwargs)
 
     return wrapper
 
 def handle_check_client(method):
     """
-    Call YandexDiskService().init_client() if check_token failed.
+    Call init_client() if check_token failed.
+    Token is checked once per YANDEX_TOKEN_CHECK_INTERVAL.
     """
     @wraps(method)
     async def wrapper(self, *args, **kwargs):
-        if not await YandexDiskService().client.check_token():
-            await YandexDiskService().init_client()
+        if monotonic() - self.token_checked_at > Config.YANDEX_TOKEN_CHECK_INTERVAL:
+            client = self.client
+
+            if await client.check_token():
+                self.token_checked_at = monotonic()
+            else:
+                await self.init_client(stale_client=client)
 
         return await method(self, *args, **kwargs)
 
@@ -45,39 +63,127 @@ def handle_check_client(method):
 
 
 class YandexDiskService(metaclass=SingletonMeta):
+    refresh_token = Config.YANDEX_API_REFRESH_TOKEN
+    client_id = Config.YANDEX_API_CLIENT_ID
+    client_secret = Config.YANDEX_API_CLIENT_SECRET
+
     client = yadisk.AsyncClient()
+    client_lock = asyncio.Lock()
+    # Monotonic time of last successful token check, wall time of last refresh
+    token_checked_at: float = float("-inf")
+    token_refreshed_at: float | None = None
+
+    links_cache = DownloadLinksCache(
+        Config.YANDEX_DOWNLOAD_LINK_TTL,
+        Config.YANDEX_DOWNLOAD_LINK_CACHE_SIZE,
+        Config.YANDEX_DOWNLOAD_LINK_STALE_TTL,
+    )
+    breaker = CircuitBreaker(Config.YANDEX_BREAKER_FAILURES, Config.YANDEX_BREAKER_RESET_TIMEOUT)
+
+    @classmethod
+    def for_account(cls, name: str, refresh_token: str, client_id: str, client_secret: str) -> "YandexDiskService":
+        """
+        Service of another Yandex Disk account, with own client, links cache and circuit breaker.
+        """
+        account_class = type(f"{cls.__name__}[{name}]", (cls,), dict(
+            refresh_token=refresh_token,
+            client_id=client_id,
+            client_secret=client_secret,
+            client=yadisk.AsyncClient(),
+            client_lock=asyncio.Lock(),
+            token_checked_at=float("-inf"),
+            token_refreshed_at=None,
+            links_cache=DownloadLinksCache(
+                Config.YANDEX_DOWNLOAD_LINK_TTL,
+                Config.YANDEX_DOWNLOAD_LINK_CACHE_SIZE,
+                Config.YANDEX_DOWNLOAD_LINK_STALE_TTL,
+            ),
+            breaker=CircuitBreaker(Config.YANDEX_BREAKER_FAILURES, Config.YANDEX_BREAKER_RESET_TIMEOUT),
+        ))
+
+        return account_class()
 
     async def init(self,):
         await self.init_client()
 
-    async def init_client(self):
+    async def init_client(self, stale_client: yadisk.AsyncClient | None = None):
         """
         Init client with new access token.
+        Concurrent calls for the same `stale_client` refresh token once.
         """
-        logger.info("Start client init")
+        async with self.client_lock:
+            if stale_client is not None and self.client is not stale_client:
+                return
 
-        new_token = await self._get_new_access_token()
-        self.client = yadisk.AsyncClient(token=new_token)
+            logger.info("Start client init")
 
-        logger.info("Client successfully recreated")
+            new_token = await self._get_new_access_token()
+            self.client = yadisk.AsyncClient(token=new_token)
+            self.token_checked_at = monotonic()
+            self.token_refreshed_at = time()
 
+            logger.info("Client successfully recreated")
+
+    @protected_call()
+    @handle_check_client
+    async def ensure_token(self) -> bool:
+        """
+        Token is valid or refreshed. Checked once per YANDEX_TOKEN_CHECK_INTERVAL, see handle_check_client.
+        """
+        return bool(self.client.token)
 
+    @protected_call(timeout=Config.YANDEX_TRANSFER_TIMEOUT)
     @handle_unauthorized_error
     @handle_check_client
-    async def upload_file(self, content: bytes, path: str):
+    async def upload_file(self, content: bytes | AsyncIterator[bytes], path: str):
+        """
+        Upload content, streamed by chunks if it is async iterator.
+        """
         logger.info(f"Start file uploading: {path}")
 
         await self.create_directory(os.path.dirname(path))
 
         upload_link = await self.client.get_upload_link(path, overwrite=True)
+        self.forget_download_link(path)
 
         logger.info(f"Got file download link: {path}")
 
         async with aiohttp.ClientSession() as session:
-            async with session.put(upload_link, data=content) as response:
+            async with session.put(upload_link, data=content, timeout=self._transfer_timeout()) as response:
                 response.raise_for_status()
                 logger.info(f"Create file: {path}")
 
+    @protected_call(timeout=Config.YANDEX_TRANSFER_TIMEOUT, retries=Config.YANDEX_RETRIES)
+    async def download(self, path: str) -> bytes:
+        link = await self.get_download_link(path)
+
+        async with aiohttp.ClientSession() as session:
+            async with session.get(link, timeout=self._transfer_timeout()) as response:
+                response.raise_for_status()
+                return await response.read()
+
+    async def iter_link_content(self, link: str, chunk_size: int = 64 * 1024, offset: int = 0) -> AsyncIterator[bytes]:
+        """
+        Stream content of download link by chunks, starting from offset byte.
+        """
+        headers = {"Range": f"bytes={offset}-"} if offset else None
+
+        async with aiohttp.ClientSession() as session:
+            async with session.get(link, headers=headers, timeout=self._transfer_timeout()) as response:
+                response.raise_for_status()
+
+                # Range is ignored, whole content is returned
+                skip = offset if offset and response.status != 206 else 0
+
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    if skip >= len(chunk):
+                        skip -= len(chunk)
+                        continue
+
+                    yield chunk[skip:]
+                    skip = 0
+
+    @protected_call(retries=Config.YANDEX_RETRIES)
     @handle_unauthorized_error
     @handle_check_client
     async def create_directory(self, dir_path: str):
@@ -98,20 +204,111 @@ class YandexDiskService(metaclass=SingletonMeta):
                 except Exception as e:
                     raise e
 
+    async def get_download_link(self, path: str) -> str:
+        link, _ = await self.get_download_link_with_expiration(path)
+        return link
+
+    async def get_download_link_with_expiration(self, path: str) -> tuple[str, float]:
+        """
+        Cached download link and its expiration timestamp.
+        Expired link is returned if Yandex Disk is unavailable.
+        """
+        cached = self.links_cache.get(path)
+
+        if cached is not None:
+            return cached
+
+        try:
+            link = await self._request_download_link(path)
+
+        except UpstreamUnavailableError:
+            stale = self.links_cache.get_stale(path)
+
+            if stale is None:
+                raise
+
+            logger.warning(f"Yandex Disk unavailable, stale link served for {path}")
+            return stale
+
+        return self.links_cache.set(path, link)
+
+    async def get_download_links(
+        self,
+        paths: list[str],
+        concurrency: int,
+    ) -> dict[str, tuple[str, float] | Exception]:
+        """
+        Links for many paths, missing in cache are requested concurrently.
+        Error of one path does not fail others, it is returned instead of link.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def get(path: str) -> tuple[str, float]:
+            async with semaphore:
+                return await self.get_download_link_with_expiration(path)
+
+        links = await asyncio.gather(*(get(path) for path in paths), return_exceptions=True)
+
+        for link in links:
+            # Cancellation is not a result
+            if isinstance(link, BaseException) and not isinstance(link, Exception):
+                raise link
+
+        return dict(zip(paths, links))
+
+    def forget_download_link(self, path: str):
+        self.links_cache.forget(path)
+
+    def forget_download_links(self, directory: str):
+        self.links_cache.forget_directory(directory)
+
+    @protected_call(retries=Config.YANDEX_RETRIES, hedge=True)
     @handle_unauthorized_error
     @handle_check_client
-    async def get_download_link(self, path: str):
+    async def _request_download_link(self, path: str) -> str:
         link = await self.client.get_download_link(path)
 
         logger.info(f"New link recieved for {path}: {link}")
 
         return link
 
+    @protected_call(retries=Config.YANDEX_RETRIES)
     @handle_unauthorized_error
     @handle_check_client
-    async def remove(self, path: str, *, throw_not_found: bool = True):
+    async def get_meta(self, path: str) -> yadisk.objects.AsyncResourceObject:
+        """
+        Get resource metadata (size, mime type, modified...). Raises PathNotFoundError if not exists.
+        """
+        return await self.client.get_meta(path, fields=["path", "type", "size", "mime_type", "md5", "modified", "revision"])
+
+    @protected_call(timeout=Config.YANDEX_TRANSFER_TIMEOUT, retries=Config.YANDEX_RETRIES)
+    @handle_unauthorized_error
+    @handle_check_client
+    async def list_directory(self, path: str, page_size: int = 1000) -> list[yadisk.objects.AsyncResourceObject]:
+        """
+        Get all directory children, pages are requested by page_size items.
+        """
+        return [
+            item async for item in self.client.listdir(
+                path,
+                limit=page_size,
+                fields=["name", "path", "type", "size", "modified"],
+            )
+        ]
+
+    @protected_call(retries=Config.YANDEX_RETRIES)
+    @handle_unauthorized_error
+    @handle_check_client
+    async def remove(self, path: str, *, throw_not_found: bool = True, permanently: bool = False):
+        """
+        Remove file or directory with its content.
+        Not `permanently` removed objects are moved to trash and still use disk quota.
+        """
+        self.forget_download_link(path)
+        self.forget_download_links(path)
+
         try:
-            await self.client.remove(path)
+            await self.client.remove(path, permanently=permanently)
             logger.warning(f"Removed object: {path}")
 
         except yadisk.exceptions.NotFoundError as e:
@@ -121,6 +318,7 @@ class YandexDiskService(metaclass=SingletonMeta):
 
             logger.warning(f"Resource not found: {path}")
 
+    @protected_call(retries=Config.YANDEX_RETRIES)
     @handle_unauthorized_error
     @handle_check_client
     async def get_upload_link(self, path: str):
@@ -132,6 +330,7 @@ class YandexDiskService(metaclass=SingletonMeta):
         try:
             await self.create_directory(os.path.dirname(path))
             upload_url = await self.client.get_upload_link(path, overwrite=True)
+            self.forget_download_link(path)
 
             if upload_url:
                 return upload_url
@@ -146,15 +345,23 @@ class YandexDiskService(metaclass=SingletonMeta):
             logger.error(f"Error generating Yandex Disk upload URL: {str(e)}")
             raise e
 
+    @staticmethod
+    def _transfer_timeout() -> aiohttp.ClientTimeout:
+        return aiohttp.ClientTimeout(
+            total=None,
+            sock_connect=Config.YANDEX_TIMEOUT,
+            sock_read=Config.YANDEX_READ_TIMEOUT,
+        )
+
     async def _get_new_access_token(self):
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=Config.YANDEX_TIMEOUT)) as session:
             async with session.post(
                 "/".join([Config.YANDEX_API_OAUTH_BASE_URL, "token"]),
                 data=dict(
                     grant_type="refresh_token",
-                    refresh_token=Config.YANDEX_API_REFRESH_TOKEN,
-                    client_id=Config.YANDEX_API_CLIENT_ID,
-                    client_secret=Config.YANDEX_API_CLIENT_SECRET,
+                    refresh_token=self.refresh_token,
+                    client_id=self.client_id,
+                    client_secret=self.client_secret,
                 )
             ) as response:
                 response_data = await response.json()
@@ -1,6 +1,10 @@
-from ._access import admin_access
+from ._access import admin_access, is_admin_request
+from ._signature import sign_path, verify_path_signature
 
 
 __all__ = [
-    "admin_access"
+    "admin_access",
+    "is_admin_request",
+    "sign_path",
+    "verify_path_signature",
 ]
@@ -10,6 +10,13 @@ from src.config import Config
 logger = logging.getLogger(__name__)
 
 
+def is_admin_request(request: Request) -> bool:
+    """
+    For endpoints, which are public with restrictions. Use admin_access for admin only ones.
+    """
+    return request.headers.get("Authorization", None) == Config.AUTHORIZATION_KEY
+
+
 class admin_access:  # pylint: disable=invalid-name
     def __init__(
         cls,
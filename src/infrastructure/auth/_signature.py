@@ -0,0 +1,29 @@
+import base64
+import hashlib
+import hmac
+from time import time
+
+
+def _digest(secret: str, path: str, expires: int) -> str:
+    message = f"{path}:{expires}".encode()
+    digest = hmac.new(secret.encode(), message, hashlib.sha256).digest()
+
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def sign_path(secret: str, path: str, expires: int) -> str:
+    """
+    Make signature for path, valid until expires (unix timestamp).
+    """
+    return _digest(secret, path, expires)
+
+
+def verify_path_signature(secret: str, path: str, expires: int, signature: str) -> bool:
+    """
+    Check signature and expiration time, pure CPU, no external calls.
+    """
+    if expires < time():
+        return False
+
+    # Bytes: compare_digest raises TypeError for non-ASCII str
+    return hmac.compare_digest(_digest(secret, path, expires).encode(), signature.encode())
@@ -0,0 +1,15 @@
+from fastapi import Request, status
+from fastapi.responses import ORJSONResponse
+
+
+def service_unavailable_handler(request: Request, exc: Exception) -> ORJSONResponse:
+    """
+    503 for exceptions with `retry_after` seconds, client may retry after it.
+    """
+    retry_after = getattr(exc, "retry_after", None) or 1
+
+    return ORJSONResponse(
+        {"detail": "Service temporarily unavailable"},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(round(retry_after))},
+    )
@@ -1 +1,3 @@
 NO_CACHE_HEADER = {"X-Cache-Control": "no-cache"}
+# Response is not stored by nginx proxy cache and browsers
+NO_STORE_HEADER = {"Cache-Control": "no-store"}
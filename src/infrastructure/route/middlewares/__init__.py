@@ -1,6 +1,9 @@
+from .admission import AdmissionControl, AdmissionControlMiddleware
 from .process_time import ProcessTimeMiddleware
 
 
 __all__ = [
+    "AdmissionControl",
+    "AdmissionControlMiddleware",
     "ProcessTimeMiddleware"
 ]
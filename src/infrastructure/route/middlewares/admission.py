@@ -0,0 +1,77 @@
+from typing import Collection
+
+from fastapi import status
+from fastapi.responses import ORJSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class AdmissionControl:
+    """
+    Requests of current worker: in flight until response starts, then streaming until it is sent.
+    Limit 0 disables it.
+    """
+    def __init__(self, max_in_flight: int, retry_after: int = 1, max_streaming: int = 0):
+        self.max_in_flight = max_in_flight
+        self.max_streaming = max_streaming
+        self.retry_after = retry_after
+
+        self.in_flight = 0
+        self.streaming = 0
+        self.rejected = 0
+
+    @property
+    def overloaded(self) -> bool:
+        return 0 < self.max_in_flight <= self.in_flight or 0 < self.max_streaming <= self.streaming
+
+
+class AdmissionControlMiddleware:
+    """
+    Rejects requests over the limit with fast 503, instead of queueing them until timeouts.
+    Pure ASGI: rejected request costs no response wrapping.
+    Long responses (archives, proxied content, local files) free the request slot when started
+    and are limited by own streaming cap.
+    """
+    def __init__(self, app: ASGIApp, admission: AdmissionControl, exempt_paths: Collection[str] = ()):
+        self.app = app
+        self.admission = admission
+        self.exempt_paths = frozenset(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        admission = self.admission
+
+        if admission.overloaded:
+            admission.rejected += 1
+
+            response = ORJSONResponse(
+                {"detail": "Service overloaded"},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(admission.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        admission.in_flight += 1
+        started = False
+
+        async def send_wrapper(message: Message):
+            nonlocal started
+
+            if message["type"] == "http.response.start" and not started:
+                started = True
+                admission.in_flight -= 1
+                admission.streaming += 1
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+
+        finally:
+            if started:
+                admission.streaming -= 1
+            else:
+                admission.in_flight -= 1
@@ -1,12 +1,14 @@
+from functools import lru_cache
 from typing import Generic, Optional, Type, TypeVar
 
 from fastapi import Query
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from tortoise.models import Model
 from tortoise.queryset import QuerySet
 
 
-T = TypeVar("T", bound=Model)
+M = TypeVar("M", bound=Model)
+T = TypeVar("T", bound=BaseModel)
 
 
 def get_pagination_params(
@@ -16,6 +18,11 @@ def get_pagination_params(
     return PaginationParams(page=page, size=size)
 
 
+@lru_cache
+def _list_adapter(schema: Type[T]) -> TypeAdapter[list[T]]:
+    return TypeAdapter(list[schema])
+
+
 class PaginationParams(BaseModel):
     page: int = Query(1, ge=1)
     size: int = Query(10, ge=1, le=100)
@@ -24,7 +31,7 @@ class PaginationParams(BaseModel):
     def offset(self) -> int:
         return (self.page - 1) * self.size
 
-    def apply_to_query(self, query: QuerySet[T]) -> QuerySet[T]:
+    def apply_to_query(self, query: QuerySet[M]) -> QuerySet[M]:
         return query.limit(self.size).offset(self.offset)
 
 
@@ -48,8 +55,8 @@ class PaginatedResponse(BaseModel, Generic[T]):
     @classmethod
     async def create(
         cls,
-        model: Type[T],
-        schema: BaseModel,
+        model: Type[M],
+        schema: Type[T],
         pagination: PaginationParams,
         filters: Optional[dict] = None,
     ) -> "PaginatedResponse[T]":
@@ -63,11 +70,21 @@ class PaginatedResponse(BaseModel, Generic[T]):
         paginated_query = pagination.apply_to_query(query)
         results = await paginated_query
 
-        return cls(
-            data=results,
+        return cls.of(schema)(
+            data=_list_adapter(schema).validate_python(results, from_attributes=True),
             pagination=pagination,
             total_items=total_items,
         )
 
+    @classmethod
+    def of(cls, schema: Type[T]) -> "Type[PaginatedResponse[T]]":
+        """
+        Parametrized class, needed for serialization of data items by schema fields.
+        """
+        if cls.__pydantic_generic_metadata__["args"]:
+            return cls
+
+        return cls[schema]
+
     class Config:
         arbitrary_types_allowed = True
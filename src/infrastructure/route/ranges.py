@@ -0,0 +1,40 @@
+import re
+
+from fastapi import HTTPException, status
+
+
+RANGE_REGEX = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """
+    Parse single "Range: bytes=start-end" header. Returns inclusive range or None for full content.
+    Multiple ranges are not supported, full content is returned for them.
+    """
+    if not header:
+        return None
+
+    match = RANGE_REGEX.match(header.strip())
+
+    if not match:
+        return None
+
+    start, end = match.groups()
+
+    if not start and not end:
+        return None
+
+    if not start:
+        # Suffix: last N bytes
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+
+    if start >= size or start > end:
+        raise HTTPException(
+            status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            "Range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+
+    return start, end
@@ -0,0 +1,18 @@
+from typing import Any
+
+from pydantic import BaseModel
+from starlette.responses import Response
+
+
+class SchemaResponse(Response):
+    """
+    Serialize pydantic model with pydantic-core directly into bytes.
+    Returned Response skips FastAPI response_model validation and jsonable_encoder.
+    """
+    media_type = "application/json"
+
+    def render(self, content: BaseModel | Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode()
+
+        return super().render(content)
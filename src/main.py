@@ -7,27 +7,56 @@ from typing import Literal
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
+from domain.files.derivatives import derivatives_pool_shutdown
 from domain.files.router import router as files_router
+from domain.files.router import signed_router as files_signed_router
+from domain.health.config import HealthConfig
+from domain.health.router import router as health_router
+from domain.jobs.worker import jobs_worker_shutdown, jobs_worker_startup
+from domain.stats.router import router as stats_router
+from domain.stats.worker import stats_worker_shutdown, stats_worker_startup
+from external.yandex_disk import UpstreamUnavailableError
 from infrastructure.database import tortoise_shutdown, tortoise_startup
 from infrastructure.openapi import build_custom_openapi_schema
 from infrastructure.rate_limit import limiter
-from infrastructure.route.middlewares import ProcessTimeMiddleware
+from infrastructure.route.errors import service_unavailable_handler
+from infrastructure.route.middlewares import (AdmissionControl,
+                                              AdmissionControlMiddleware,
+                                              ProcessTimeMiddleware)
 from infrastructure.logging import init_logging_settings
 
 
 init_logging_settings()
-app = FastAPI(docs_url="/api/docs")
+app = FastAPI(docs_url="/api/docs", default_response_class=ORJSONResponse)
 
 app.state.limiter = limiter
+app.state.admission = AdmissionControl(
+    HealthConfig.ADMISSION_MAX_IN_FLIGHT,
+    HealthConfig.ADMISSION_RETRY_AFTER,
+    HealthConfig.ADMISSION_MAX_STREAMING,
+)
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+app.add_exception_handler(UpstreamUnavailableError, service_unavailable_handler)
 
 app.add_event_handler("startup", tortoise_startup)
+app.add_event_handler("startup", jobs_worker_startup)
+app.add_event_handler("startup", stats_worker_startup)
+app.add_event_handler("shutdown", jobs_worker_shutdown)
+app.add_event_handler("shutdown", stats_worker_shutdown)
+app.add_event_handler("shutdown", derivatives_pool_shutdown)
 app.add_event_handler("shutdown", tortoise_shutdown)
 
 app.add_middleware(ProcessTimeMiddleware)
+# Inside of CORS: rejected responses still have CORS headers
+app.add_middleware(
+    AdmissionControlMiddleware,
+    admission=app.state.admission,
+    exempt_paths=["/health/live", "/health/ready", "/test/ping"],
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -41,6 +70,9 @@ def ping():
     return "pong"
 
 
+app.include_router(health_router)
+app.include_router(files_signed_router)
+app.include_router(stats_router)
 app.include_router(files_router)
 
 app.openapi_schema = build_custom_openapi_schema(app)
@@ -1,10 +1,14 @@
 from ._singleton import SingletonMeta
 from ._slugify import slugify
 from ._uuid import is_uuid
+from ._zip_stream import ZipEntry, ZipStream, unique_entry_names
 
 
 __all__ = [
     "SingletonMeta",
     "slugify",
-    "is_uuid"
+    "is_uuid",
+    "ZipEntry",
+    "ZipStream",
+    "unique_entry_names",
 ]
@@ -1,55 +1,144 @@
 import re
+import string
+import unicodedata
 
 SLUG_SPLITTER = "-"
+ALLOWED_CHARS = frozenset(string.ascii_lowercase + string.digits + SLUG_SPLITTER)
 
+# Lowercase letters only, uppercase ones are derived
+CYRILLIC = {
+    # Russian
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d",
+    "е": "e", "ё": "yo", "ж": "zh", "з": "z", "и": "i",
+    "й": "y", "к": "k", "л": "l", "м": "m", "н": "n",
+    "о": "o", "п": "p", "р": "r", "с": "s", "т": "t",
+    "у": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch",
+    "ш": "sh", "щ": "shch", "ъ": "", "ы": "y", "ь": "",
+    "э": "e", "ю": "yu", "я": "ya",
+    # Ukrainian, Belarusian
+    "є": "ye", "і": "i", "ї": "yi", "ґ": "g", "ў": "u",
+    # Kazakh
+    "ә": "a", "ғ": "gh", "қ": "q", "ң": "ng", "ө": "o", "ұ": "u", "ү": "u", "һ": "h",
+    # Serbian, Macedonian
+    "ђ": "dj", "ј": "j", "љ": "lj", "њ": "nj", "ћ": "c", "џ": "dz", "ѓ": "gj", "ќ": "kj", "ѕ": "dz",
+}
 
-def _transliterate(text):
-    translit_map = {
-        "а": "a", "б": "b", "в": "v", "г": "g", "д": "d",
-        "е": "e", "ё": "yo", "ж": "zh", "з": "z", "и": "i",
-        "й": "y", "к": "k", "л": "l", "м": "m", "н": "n",
-        "о": "o", "п": "p", "р": "r", "с": "s", "т": "t",
-        "у": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch",
-        "ш": "sh", "щ": "shch", "ъ": "", "ы": "y", "ь": "",
-        "э": "e", "ю": "yu", "я": "ya",
-        "А": "A", "Б": "B", "В": "V", "Г": "G", "Д": "D",
-        "Е": "E", "Ё": "Yo", "Ж": "Zh", "З": "Z", "И": "I",
-        "Й": "Y", "К": "K", "Л": "L", "М": "M", "Н": "N",
-        "О": "O", "П": "P", "Р": "R", "С": "S", "Т": "T",
-        "У": "U", "Ф": "F", "Х": "Kh", "Ц": "Ts", "Ч": "Ch",
-        "Ш": "Sh", "Щ": "Shch", "Ъ": "", "Ы": "Y", "Ь": "",
-        "Э": "E", "Ю": "Yu", "Я": "Ya"
-    }
-    return "".join(translit_map.get(char, char) for char in text)
-
-def _shorten(text: str, max_length: int):
-    parts = text.split(SLUG_SPLITTER)
-    result = ""
-
-    if len(parts) == 1:
-        return parts[:max_length]
-
-    for part in parts:
-        if result + part + len(SLUG_SPLITTER) > max_length:
-            return result
-
-        result += SLUG_SPLITTER + part
-
-    return result
-
-def slugify(text: str, max_length: int = None):
+# Latin letters, which are not decomposed to ASCII by NFKD
+LATIN = {
+    "ß": "ss", "æ": "ae", "œ": "oe", "ø": "o", "ł": "l", "đ": "d", "ð": "d", "þ": "th", "ı": "i",
+}
+
+GREEK = {
+    "α": "a", "β": "v", "γ": "g", "δ": "d", "ε": "e", "ζ": "z", "η": "i", "θ": "th",
+    "ι": "i", "κ": "k", "λ": "l", "μ": "m", "ν": "n", "ξ": "x", "ο": "o", "π": "p",
+    "ρ": "r", "σ": "s", "ς": "s", "τ": "t", "υ": "y", "φ": "f", "χ": "ch", "ψ": "ps", "ω": "o",
+}
+
+
+# Sequence table: indexing is several times faster than dict lookup in str.translate.
+# Covers all whitespace chars, chars after its end raise IndexError and are kept by translate for NFKD pass.
+TABLE_SIZE = 0x3001
+
+
+def _ascii_replacement(char: str) -> str | None:
+    if char in ALLOWED_CHARS:
+        return char
+
+    if char in string.ascii_uppercase:
+        return char.lower()
+
+    if char.isspace():
+        return SLUG_SPLITTER
+
+    return None
+
+
+def _replacement(char: str) -> str | None:
+    if char.isascii():
+        return _ascii_replacement(char)
+
+    if char.isspace():
+        return SLUG_SPLITTER
+
+    # Letters, marks and numbers are kept for NFKD, punctuation, symbols and control chars are removed
+    if unicodedata.category(char)[0] in "PSZC":
+        return None
+
+    return char
+
+
+def _build_table() -> list[str | None]:
+    letters = {**CYRILLIC, **LATIN, **GREEK}
+    table = [_replacement(chr(code)) for code in range(TABLE_SIZE)]
+
+    # Uppercase letters are found by lowercase ones: "ẞ".lower() is "ß", but "ß".upper() is "SS"
+    for code in range(TABLE_SIZE):
+        replacement = letters.get(chr(code).lower())
+
+        if replacement is not None:
+            table[code] = replacement
+
+    return table
+
+
+def _build_ascii_table() -> tuple[bytes, bytes]:
+    replacements = [_ascii_replacement(chr(code)) for code in range(128)]
+
+    table = bytes.maketrans(
+        bytes(code for code in range(128) if replacements[code]),
+        "".join(replacement for replacement in replacements if replacement).encode(),
+    )
+    deleted = bytes(code for code in range(128) if replacements[code] is None)
+
+    return table, deleted
+
+
+TRANSLATION_TABLE = _build_table()
+ASCII_TABLE, ASCII_DELETED = _build_ascii_table()
+
+SPLITTERS = re.compile(r"-{2,}")
+
+
+def _transliterate(text: str) -> str:
+    if text.isascii():
+        return text.encode().translate(ASCII_TABLE, ASCII_DELETED).decode()
+
+    text = text.translate(TRANSLATION_TABLE)
+
+    if text.isascii():
+        return text
+
+    # Letters without own table, accents are dropped: "é" -> "e", other symbols are removed
+    text = unicodedata.normalize("NFKD", text).translate(TRANSLATION_TABLE)
+
+    return text.encode("ascii", "ignore").decode()
+
+
+def _shorten(text: str, max_length: int) -> str:
+    """
+    Cut to max_length by word boundary, single long word is cut as is.
+    """
+    if len(text) <= max_length:
+        return text
+
+    boundary = text.rfind(SLUG_SPLITTER, 0, max_length + 1)
+
+    if boundary > 0:
+        return text[:boundary]
+
+    return text[:max_length].rstrip(SLUG_SPLITTER)
+
+
+def slugify(text: str, max_length: int | None = None) -> str:
     text = _transliterate(text)
-    text = text.lower()
 
-    # Replace spaces and non-alphanumeric characters with hyphens
-    text = re.sub(r"\s+", SLUG_SPLITTER, text)  # Replace spaces with hyphens
-    text = re.sub(r"[^a-z0-9\-]", "", text)  # Remove everything except letters, digits, and hyphens
+    # Replace multiple hyphens with one, remove hyphens at the beginning and end
+    if SLUG_SPLITTER * 2 in text:
+        text = SPLITTERS.sub(SLUG_SPLITTER, text)
 
-    # Remove extra hyphens
-    text = re.sub(r"-+", SLUG_SPLITTER, text)  # Replace multiple hyphens with one
-    text = text.strip(SLUG_SPLITTER)  # Remove hyphens at the beginning and end
+    text = text.strip(SLUG_SPLITTER)
 
-    if max_length and len(text) > max_length:
-        _shorten(text, max_length)
+    if max_length:
+        text = _shorten(text, max_length)
 
     return text
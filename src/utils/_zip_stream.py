@@ -0,0 +1,241 @@
+import asyncio
+import struct
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Callable
+
+
+VERSION = 45  # ZIP64
+FLAGS = 0x0008 | 0x0800  # Data descriptor, UTF-8 names
+ZIP64_LIMIT = 0xFFFFFFFF
+
+LOCAL_HEADER_SIZE = 30 + 20  # With ZIP64 extra
+DATA_DESCRIPTOR_SIZE = 24
+CENTRAL_HEADER_SIZE = 46 + 28  # With ZIP64 extra
+END_RECORDS_SIZE = 56 + 20 + 22
+
+
+@dataclass
+class ZipEntry:
+    name: str
+    size: int
+    modified_at: datetime
+    # Called with offset, when entry content is needed from this byte
+    open: Callable[[int], AsyncIterator[bytes]]
+    # Known CRC-32 lets skip content before range start, otherwise it is read to compute CRC
+    crc: int | None = None
+
+
+def _dos_datetime(value: datetime) -> tuple[int, int]:
+    value = max(value, datetime(1980, 1, 1, tzinfo=value.tzinfo))
+
+    time = value.hour << 11 | value.minute << 5 | value.second // 2
+    date = (value.year - 1980) << 9 | value.month << 5 | value.day
+
+    return time, date
+
+
+def unique_entry_names(names: list[str]) -> list[str]:
+    """
+    "a.txt", "a.txt" -> "a.txt", "a (1).txt"
+    """
+    used = set()
+    result = []
+
+    for name in names:
+        unique_name = name
+        counter = 1
+
+        while unique_name in used:
+            stem, dot, extension = name.rpartition(".")
+            unique_name = f"{stem} ({counter}).{extension}" if dot else f"{name} ({counter})"
+            counter += 1
+
+        used.add(unique_name)
+        result.append(unique_name)
+
+    return result
+
+
+class ZipStream:
+    """
+    ZIP64 archive in store mode, generated chunk by chunk in constant memory.
+    Entry sizes must be known before, so archive size is known before streaming.
+    Range from the middle is served without reading previous entries, if their CRCs are known.
+    Contents of next `prefetch` entries are fetched concurrently, by `queue_size` chunks max.
+    """
+    def __init__(self, entries: list[ZipEntry], prefetch: int = 4, queue_size: int = 8):
+        self.entries = entries
+        self.names = [entry.name.encode() for entry in entries]
+        self.prefetch = max(prefetch, 1)
+        self.queue_size = queue_size
+
+    @property
+    def size(self) -> int:
+        return sum(
+            LOCAL_HEADER_SIZE + DATA_DESCRIPTOR_SIZE + CENTRAL_HEADER_SIZE + 2 * len(name) + entry.size
+            for entry, name in zip(self.entries, self.names)
+        ) + END_RECORDS_SIZE
+
+    async def iter_bytes(self, start: int = 0, end: int | None = None) -> AsyncIterator[bytes]:
+        """
+        Archive bytes in [start, end] range (inclusive).
+        Content before start is read only for entries without known CRC.
+        """
+        end = self.size - 1 if end is None else end
+        chunks = self._generate(start)
+
+        try:
+            async for chunk_start, chunk in chunks:
+                chunk_end = chunk_start + len(chunk)
+
+                if chunk_end <= start:
+                    continue
+
+                if chunk_start > end:
+                    return
+
+                yield chunk[max(start - chunk_start, 0):end - chunk_start + 1]
+
+        finally:
+            # Stops prefetch tasks, when client disconnects or range ends
+            await chunks.aclose()
+
+    def _skipped(self, start: int) -> list[int]:
+        """
+        Content bytes of each entry, which are before start and not needed.
+        """
+        skipped = []
+        offset = 0
+
+        for entry, name in zip(self.entries, self.names):
+            content_offset = offset + LOCAL_HEADER_SIZE + len(name)
+            offset = content_offset + entry.size + DATA_DESCRIPTOR_SIZE
+
+            if entry.crc is None:
+                skipped.append(0)
+            else:
+                skipped.append(min(max(start - content_offset, 0), entry.size))
+
+        return skipped
+
+    async def _generate(self, start: int = 0) -> AsyncIterator[tuple[int, bytes]]:
+        """
+        Chunks with their offsets in archive, skipped content is not yielded.
+        """
+        skipped = self._skipped(start)
+        central_directory = []
+        offset = 0
+        queues: list[asyncio.Queue | None] = []
+        tasks: list[asyncio.Task] = []
+
+        def start_prefetch():
+            while len(queues) < len(self.entries) and len(queues) < index + self.prefetch:
+                entry_index = len(queues)
+
+                if skipped[entry_index] == self.entries[entry_index].size:
+                    queues.append(None)
+                    continue
+
+                queue = asyncio.Queue(self.queue_size)
+                queues.append(queue)
+                tasks.append(asyncio.create_task(self._fetch(self.entries[entry_index], queue, skipped[entry_index])))
+
+        try:
+            for index, (entry, name) in enumerate(zip(self.entries, self.names)):
+                start_prefetch()
+
+                time, date = _dos_datetime(entry.modified_at)
+                local_header = self._local_header(name, time, date)
+                yield offset, local_header
+
+                position = offset + len(local_header) + skipped[index]
+                crc = 0
+                size = skipped[index]
+                queue = queues[index]
+
+                while queue is not None and (chunk := await queue.get()) is not None:
+                    if isinstance(chunk, Exception):
+                        raise chunk
+
+                    if entry.crc is None:
+                        crc = zlib.crc32(chunk, crc)
+
+                    yield position, chunk
+                    position += len(chunk)
+                    size += len(chunk)
+
+                queues[index] = None
+
+                if size != entry.size:
+                    raise ValueError(f"Entry {entry.name} size mismatch: expected {entry.size}, got {size}")
+
+                crc = crc if entry.crc is None else entry.crc
+                yield position, struct.pack("<IIQQ", 0x08074B50, crc, size, size)
+
+                central_directory.append(self._central_header(name, time, date, crc, size, offset))
+                offset += len(local_header) + size + DATA_DESCRIPTOR_SIZE
+
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        directory_size = 0
+
+        for header in central_directory:
+            yield offset + directory_size, header
+            directory_size += len(header)
+
+        yield offset + directory_size, self._end_records(len(central_directory), directory_size, offset)
+
+    async def _fetch(self, entry: ZipEntry, queue: asyncio.Queue, offset: int):
+        try:
+            async for chunk in entry.open(offset):
+                if chunk:
+                    await queue.put(chunk)
+
+            await queue.put(None)
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as e:
+            await queue.put(e)
+
+    @staticmethod
+    def _local_header(name: bytes, time: int, date: int) -> bytes:
+        extra = struct.pack("<HHQQ", 0x0001, 16, 0, 0)
+
+        return struct.pack(
+            "<IHHHHHIIIHH",
+            0x04034B50, VERSION, FLAGS, 0, time, date,
+            0, ZIP64_LIMIT, ZIP64_LIMIT, len(name), len(extra),
+        ) + name + extra
+
+    @staticmethod
+    def _central_header(name: bytes, time: int, date: int, crc: int, size: int, offset: int) -> bytes:
+        extra = struct.pack("<HHQQQ", 0x0001, 24, size, size, offset)
+
+        return struct.pack(
+            "<IHHHHHHIIIHHHHHII",
+            0x02014B50, 3 << 8 | VERSION, VERSION, FLAGS, 0, time, date,
+            crc, ZIP64_LIMIT, ZIP64_LIMIT, len(name), len(extra), 0, 0, 0, 0o100644 << 16, ZIP64_LIMIT,
+        ) + name + extra
+
+    @staticmethod
+    def _end_records(count: int, directory_size: int, directory_offset: int) -> bytes:
+        zip64_end_offset = directory_offset + directory_size
+
+        zip64_end = struct.pack(
+            "<IQHHIIQQQQ",
+            0x06064B50, 44, 3 << 8 | VERSION, VERSION, 0, 0,
+            count, count, directory_size, directory_offset,
+        )
+        zip64_locator = struct.pack("<IIQI", 0x07064B50, 0, zip64_end_offset, 1)
+        end = struct.pack(
+            "<IHHHHIIH",
+            0x06054B50, 0, 0, 0xFFFF, 0xFFFF, ZIP64_LIMIT, ZIP64_LIMIT, 0,
+        )
+
+        return zip64_end + zip64_locator + end